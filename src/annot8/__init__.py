@@ -7,31 +7,33 @@ in various programming language files.
 
 from __future__ import annotations
 
-__all__ = ["__version__"]
-
-# Prefer stdlib 'importlib.metadata'; fall back to the backport if needed.
-try:
-    from importlib.metadata import PackageNotFoundError
-    from importlib.metadata import version as _get_version
-except ImportError:  # pragma: no cover - for very old Python only
-    try:
-        from importlib_metadata import PackageNotFoundError
-        from importlib_metadata import version as _get_version  # type: ignore
-    except ImportError:  # pragma: no cover - metadata unavailable
-        _get_version = None  # type: ignore[assignment]
-
-        class PackageNotFoundError(Exception):  # type: ignore[no-redef]
-            """Placeholder when importlib metadata is unavailable."""
+__all__ = ["__version__"]  # pylint: disable=undefined-all-variable
 
 
 def _read_version() -> str:
     """Best-effort package version without broad exception catches."""
-    if _get_version is None:  # metadata API unavailable
-        return "0.0.0"
+    # pylint: disable=import-outside-toplevel
+    # Prefer stdlib 'importlib.metadata'; fall back to the backport if needed.
+    try:
+        from importlib.metadata import PackageNotFoundError
+        from importlib.metadata import version as _get_version
+    except ImportError:  # pragma: no cover - for very old Python only
+        try:
+            from importlib_metadata import PackageNotFoundError  # type: ignore
+            from importlib_metadata import version as _get_version  # type: ignore
+        except ImportError:  # pragma: no cover - metadata unavailable
+            return "0.0.0"
     try:
-        return _get_version("annot8")  # type: ignore[operator]
+        return _get_version("annot8")
     except PackageNotFoundError:
         return "0.0.0"
 
 
-__version__ = _read_version()
+def __getattr__(name: str) -> str:
+    # importlib.metadata is slow to import and the CLI never needs the version,
+    # so it is looked up on first access only (PEP 562).
+    if name == "__version__":
+        version = _read_version()
+        globals()["__version__"] = version
+        return version
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,21 +3,47 @@
 
 """Core functionality for adding and updating file headers."""
 
+import codecs
+import locale
 import logging
 import os
 import re
+import stat
 import subprocess
+import tempfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache, partial
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from types import MappingProxyType
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Deque,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
+from .backup import BackupWriter
 from .config import Annot8Config
 from .git_integration import (
     get_git_metadata,
     get_git_root,
     get_git_staged_files,
     get_git_tracked_files,
+    get_git_user,
     get_gitignore_patterns,
     is_gitignored,
 )
@@ -125,6 +151,31 @@ PATTERNS = [
     FilePattern([".ui", ".qrc"], "<!--", "-->"),  # Qt UI and resource files
 ]
 
+
+def _build_extension_table(patterns: List[FilePattern]) -> Dict[str, Tuple[str, str]]:
+    """Map each lowercased extension to its comment style; earlier patterns win."""
+    table: Dict[str, Tuple[str, str]] = {}
+    for pattern in patterns:
+        for ext in pattern.extensions:
+            table.setdefault(ext.lower(), (pattern.comment_start, pattern.comment_end))
+    return table
+
+
+@lru_cache(maxsize=1)
+def _extension_table(pattern_count: int) -> Mapping[str, Tuple[str, str]]:
+    """
+    Extension -> (comment_start, comment_end) table for the current PATTERNS.
+
+    Keyed by the number of patterns so entries appended to PATTERNS after
+    import are picked up. The cached table is shared by every caller and
+    worker thread, so it is handed out read-only.
+    """
+    return MappingProxyType(_build_extension_table(PATTERNS[:pattern_count]))
+
+
+# Sentinel style for suffixes that need a look at the file content
+_CONTENT_DEPENDENT_STYLE: Tuple[str, str] = ("", "")
+
 # Define directories to ignore
 IGNORED_DIRS: Set[str] = {
     "__pycache__",
@@ -204,6 +255,9 @@ IGNORED_FILES: Set[str] = {
     ".idea/modules.xml",
 }
 
+# Extensions of documentation and data files that never get a header
+_DOCUMENTATION_EXTENSIONS = frozenset({".md", ".markdown", ".json"})
+
 # Define shader file extensions to skip (require #version directive at top)
 SHADER_EXTENSIONS = {
     ".vert",  # Vertex shader
@@ -370,16 +424,193 @@ SPECIAL_FILE_COMMENTS: Dict[str, Tuple[str, str]] = {
 }
 
 
+# Comment markers recognized when detecting an existing header
+_HEADER_MARKERS: Tuple[Tuple[str, str], ...] = (
+    ("#", ""),
+    ("//", ""),
+    ("/*", "*/"),
+    ("<!--", "-->"),
+    ("%", ""),  # LaTeX
+    (";", ""),  # Assembly, INI
+    ("--", ""),  # SQL, Haskell
+    ("REM", ""),  # Batch
+)
+_HEADER_MARKER_STARTS = tuple(start for start, _end in _HEADER_MARKERS)
+# No marker is a prefix of another, so the one a line opens with is unambiguous;
+# it maps to its (priority, marker pair) in _HEADER_MARKERS
+_HEADER_MARKER_RE = re.compile("|".join(re.escape(start) for start, _end in _HEADER_MARKERS))
+_HEADER_MARKER_RANKS = {marker[0]: (rank, marker) for rank, marker in enumerate(_HEADER_MARKERS)}
+
+# Keywords that mark a comment line as header-like, and the labels extracted from it
+_HEADER_HINT_KEYWORDS = ("file", "source", "path", "filename", "@file")
+_HEADER_PATTERN_KEYWORDS = ("file:", "source:", "path:", "filename:", "@file")
+
+# Keywords identifying the file path line of an existing header
+_FILE_PATH_KEYWORDS = ("file:", "filename:", "path:", "@file")
+
+# Keywords identifying metadata lines worth preserving
+_METADATA_KEYWORDS = ("author:", "version:", "copyright:", "created:", "description:")
+
+
+def _keyword_union(keywords: Tuple[str, ...]) -> "re.Pattern[str]":
+    """Compile keywords into one alternation, searched against lowercased text."""
+    return re.compile("|".join(re.escape(keyword) for keyword in keywords))
+
+
+# One regex search per lowercased line instead of a substring scan per keyword
+_HEADER_HINT_RE = _keyword_union(_HEADER_HINT_KEYWORDS)
+_METADATA_RE = _keyword_union(_METADATA_KEYWORDS)
+_FILE_PATH_RE = _keyword_union(_FILE_PATH_KEYWORDS)
+
+
+# Extensions of XML-like files whose leading declarations must stay on top
+_XML_LIKE_EXTENSIONS = frozenset(
+    {
+        # HTML/XML family
+        ".html",
+        ".htm",
+        ".xhtml",
+        ".xml",
+        ".ui",
+        ".qrc",
+        ".ts",
+        # Web component frameworks
+        ".vue",
+        ".svelte",
+        ".astro",
+        ".wxml",
+        ".blade.php",
+        ".hbs",
+        ".handlebars",
+        ".ejs",
+        ".mustache",
+        ".mst",
+        # Documentation formats
+        ".mdx",
+        ".jsx",
+        ".tsx",  # JSX can sometimes have XML-like structure
+    }
+)
+
+
+# Leading lines of XML-like files that must stay above the header. Only
+# ASCII letters fold case, matching the lowercased prefix checks it replaces.
+_DECLARATION_RE = re.compile(r"\s*(?ai:<\?xml|<!doctype|<\?php|<%|<script setup|<template)")
+
+
+# Comment styles recognised from the first line of a file with an unknown
+# type; no marker is a prefix of another, so one match decides the style
+_FIRST_LINE_STYLES: Dict[str, Tuple[str, str]] = {
+    "//": ("//", ""),
+    "#": ("#", ""),
+    "/*": ("/*", "*/"),
+    "<!--": ("<!--", "-->"),
+}
+_FIRST_LINE_MARKER_RE = re.compile("|".join(map(re.escape, _FIRST_LINE_STYLES)))
+
+
+# Bytes from the start of a .ts file searched for Qt translation markup
+_QT_PROBE_SIZE = 512
+
+
+# Files larger than this are checked for a current header from their first
+# block before being read in full
+_HEAD_READ_SIZE = 4096
+
+# Whole lines the first block must hold to cover every header-handling lookahead
+_HEAD_MIN_LINES = 16
+
+# Line boundaries str.splitlines honours besides "\n"; rewriting a file turns
+# them into "\n", so a file holding any of them is never judged from its head
+_EXTRA_LINE_BREAK_RE = re.compile("[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+_ASCII_EXTRA_LINE_BREAKS = "\r\x0b\x0c\x1c\x1d\x1e"
+
+# On POSIX paths already use forward slashes and need no normalization
+_NATIVE_FORWARD_SLASHES = os.sep == "/"
+
+# Suffix of the temporary file an updated file is written to before it
+# replaces the original
+_TEMP_SUFFIX = ".annot8-tmp"
+
+# Flags files are opened with when only their first bytes are sniffed
+_SNIFF_OPEN_FLAGS = os.O_RDONLY | getattr(os, "O_BINARY", 0)
+
+
+def _debug(msg: str, *args: object) -> None:
+    """
+    Log a per-file debug message.
+
+    Checking the level first skips logging.debug()'s handler check and
+    dispatch for every file when debug output is off, as it usually is.
+    """
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug(msg, *args)
+
+
 def _normalize_path(path: str) -> str:
     """Normalize path separators to forward slashes."""
+    if _NATIVE_FORWARD_SLASHES:
+        return path
     return path.replace(os.sep, "/")
 
 
+def _relative_path(path: str, root: str) -> str:
+    """
+    Return ``path`` relative to ``root``.
+
+    Paths found by walking ``root`` already start with it, so the common prefix
+    is sliced off directly; anything else goes through ``os.path.relpath``.
+    """
+    prefix = root if root.endswith(os.sep) else root + os.sep
+    if path.startswith(prefix):
+        relative = path[len(prefix) :]
+        if relative and os.pardir not in relative:
+            return relative
+    return os.path.relpath(path, root)
+
+
+def _relative_to(path: Path, root: Path) -> str:
+    """
+    Return ``str(path.relative_to(root))``, raising ValueError the same way.
+
+    As in _relative_path, a path that starts with the root's string form is
+    sliced instead of having its parts compared by pathlib.
+    """
+    root_str = os.fspath(root)
+    prefix = root_str if root_str.endswith(os.sep) else root_str + os.sep
+    path_str = os.fspath(path)
+    if path_str.startswith(prefix):
+        return path_str[len(prefix) :]
+    return str(path.relative_to(root))
+
+
+@lru_cache(maxsize=8)
+def _format_date(date_format: str, now: datetime) -> str:
+    """
+    Format the current time for a header.
+
+    Every file processed within the same second gets the same date, so it is
+    formatted once per second and format instead of once per file.
+    """
+    return now.strftime(date_format)
+
+
+def _current_date(date_format: str) -> str:
+    """Format the current time for a header, through _format_date unless it shows microseconds."""
+    now = datetime.now()
+    if "%f" in date_format:
+        # A truncated, cached time would always show 000000 microseconds
+        return now.strftime(date_format)
+    return _format_date(date_format, now.replace(microsecond=0))
+
+
 def _get_template_variables(
     file_path: Path,
     project_root: Path,
     config: Optional[Annot8Config] = None,
     use_git_metadata: bool = False,
+    git_root: Optional[Path] = None,
+    git_user: Optional[Tuple[Optional[str], Optional[str]]] = None,
 ) -> Dict[str, str]:
     """
     Get all available template variables.
@@ -389,29 +620,33 @@ def _get_template_variables(
         project_root: Root directory of the project
         config: Optional configuration object
         use_git_metadata: If True, try to get metadata from git
+        git_root: Root of the git repository, if already known
+        git_user: The repository's (user name, user email), if already known
 
     Returns:
         Dictionary of variable names to values
     """
-    relative_path = os.path.relpath(file_path, project_root)
+    relative_path = _normalize_path(_relative_path(os.fspath(file_path), os.fspath(project_root)))
     variables: Dict[str, str] = {
-        "file_path": _normalize_path(relative_path),
+        "file_path": relative_path,
         "file_name": file_path.name,
         "file_stem": file_path.stem,
         "file_suffix": file_path.suffix,
-        "file_dir": _normalize_path(os.path.relpath(file_path.parent, project_root)),
+        # The path is normalized, so its directory ends at the last "/"
+        "file_dir": relative_path.rpartition("/")[0] or os.curdir,
     }
 
     # Try to get git metadata if requested
     git_metadata = {}
     if use_git_metadata:
-        git_root = get_git_root(project_root)
+        if git_root is None:
+            git_root = get_git_root(project_root)
         if git_root:
             try:
                 config_dict = {}
                 if config:
                     config_dict["date_format"] = config.header.date_format
-                git_metadata = get_git_metadata(file_path, git_root, config_dict)
+                git_metadata = get_git_metadata(file_path, git_root, config_dict, git_user)
             except (OSError, ValueError, subprocess.SubprocessError, AttributeError):
                 logging.debug("Failed to get git metadata for %s", file_path)
 
@@ -441,11 +676,10 @@ def _get_template_variables(
                 variables["date"] = git_date
             else:
                 try:
-                    date_str = datetime.now().strftime(config.header.date_format)
-                    variables["date"] = date_str
+                    variables["date"] = _current_date(config.header.date_format)
                 except (ValueError, TypeError):
                     # Invalid date format, use default
-                    variables["date"] = datetime.now().strftime("%Y-%m-%d")
+                    variables["date"] = _current_date("%Y-%m-%d")
     elif use_git_metadata and git_metadata:
         # No config, but use git metadata if available
         author = git_metadata.get("author")
@@ -461,6 +695,46 @@ def _get_template_variables(
     return variables
 
 
+# Matches {variable} or {variable|default} in header templates
+_TEMPLATE_VARIABLE_RE = re.compile(r"\{([^}]+)\}")
+
+# A parsed template: the literal text around its variables, comment markers
+# and line breaks included, and each variable's (name, default)
+_ParsedTemplate = Tuple[Tuple[str, ...], Tuple[Tuple[str, str], ...]]
+
+
+@lru_cache(maxsize=16)
+def _parse_template(template: str, comment_start: str, comment_end: str) -> _ParsedTemplate:
+    """
+    Split a header template into its literal text and variables.
+
+    The template and comment style are the same for every file of a type in
+    a run, so the template is parsed and comment-formatted once; rendering
+    it for a file only joins the literal text with that file's values.
+    """
+    literals = [""]
+    variables: List[Tuple[str, str]] = []
+    for index, line in enumerate(template.splitlines()):
+        if index:
+            literals[-1] += "\n"
+        # Skip empty lines in template (user controls spacing)
+        if not line.strip():
+            continue
+        # Literal text and variable expressions alternate in the split
+        pieces = _TEMPLATE_VARIABLE_RE.split(line)
+        prefix, suffix = _comment_affixes(comment_start, comment_end)
+        literals[-1] += prefix + pieces[0]
+        for var_expr, literal in zip(pieces[1::2], pieces[2::2]):
+            if "|" in var_expr:
+                var_name, default = var_expr.split("|", 1)
+                variables.append((var_name.strip(), default.strip()))
+            else:
+                variables.append((var_expr, ""))
+            literals.append(literal)
+        literals[-1] += suffix
+    return tuple(literals), tuple(variables)
+
+
 def _render_template(
     template: str, variables: Dict[str, str], comment_start: str, comment_end: str
 ) -> str:
@@ -481,41 +755,12 @@ def _render_template(
     Returns:
         Rendered template with comment formatting applied
     """
-    lines = template.splitlines()
-    rendered_lines: List[str] = []
-
-    for line in lines:
-        # Skip empty lines in template (user controls spacing)
-        if not line.strip():
-            rendered_lines.append("")
-            continue
-
-        # Substitute variables in the line
-        rendered_line = line
-        # Find all {variable} or {variable|default} patterns
-
-        def replace_var(match) -> str:
-            var_expr = match.group(1)
-            if "|" in var_expr:
-                var_name, default = var_expr.split("|", 1)
-                var_name = var_name.strip()
-                default = default.strip()
-                return variables.get(var_name, default) or ""
-            return variables.get(var_expr, "") or ""
-
-        # Match {variable} or {variable|default}
-        pattern = r"\{([^}]+)\}"
-        rendered_line = re.sub(pattern, replace_var, rendered_line)
-
-        # Apply comment formatting
-        if comment_end:
-            formatted_line = f"{comment_start} {rendered_line} {comment_end}"
-        else:
-            formatted_line = f"{comment_start} {rendered_line}"
-
-        rendered_lines.append(formatted_line)
-
-    return "\n".join(rendered_lines)
+    literals, template_variables = _parse_template(template, comment_start, comment_end)
+    parts = [literals[0]]
+    for (var_name, default), literal in zip(template_variables, literals[1:]):
+        parts.append(variables.get(var_name, default) or "")
+        parts.append(literal)
+    return "".join(parts)
 
 
 def _create_header(
@@ -523,6 +768,9 @@ def _create_header(
     project_root: Path,
     config: Optional[Annot8Config] = None,
     use_git_metadata: bool = False,
+    git_root: Optional[Path] = None,
+    comment_style: Optional[Tuple[str, str]] = None,
+    git_user: Optional[Tuple[Optional[str], Optional[str]]] = None,
 ) -> str:
     """
     Create the header content for a file.
@@ -533,16 +781,23 @@ def _create_header(
         file_path: Path to the file
         project_root: Root directory of the project
         config: Optional configuration object
+        use_git_metadata: If True, try to get metadata from git
+        git_root: Root of the git repository, if already known
+        comment_style: The file's (comment start, comment end), if already resolved
+        git_user: The repository's (user name, user email), if already known
 
     Returns:
         Header content string (may be multi-line)
     """
-    comment_style = _get_comment_style(file_path)
+    if comment_style is None:
+        comment_style = _get_comment_style(file_path)
     comment_start = comment_style[0] if comment_style else "#"
     comment_end = comment_style[1] if comment_style else ""
 
     # Get template variables
-    variables = _get_template_variables(file_path, project_root, config, use_git_metadata)
+    variables = _get_template_variables(
+        file_path, project_root, config, use_git_metadata, git_root, git_user
+    )
 
     # Use custom template if provided
     if config and config.header.template:
@@ -550,61 +805,38 @@ def _create_header(
 
     # Default behavior: create simple header with optional metadata
     header_lines: List[str] = []
-    header_lines.append(f"File: {variables['file_path']}")
+    header_lines.append(
+        _create_header_line(comment_start, comment_end, f"File: {variables['file_path']}")
+    )
 
     # Add metadata if configured
     if config:
-        if config.header.author:
-            header_lines.append(f"Author: {config.header.author}")
-        if config.header.author_email:
-            header_lines.append(f"Email: {config.header.author_email}")
-        if config.header.version:
-            header_lines.append(f"Version: {config.header.version}")
-        if config.header.include_date and "date" in variables:
-            header_lines.append(f"Date: {variables['date']}")
-
-    # Format each line with comments
-    formatted_lines: List[str] = []
-    for line in header_lines:
-        if comment_end:
-            formatted_lines.append(f"{comment_start} {line} {comment_end}")
-        else:
-            formatted_lines.append(f"{comment_start} {line}")
+        header = config.header
+        # The configured metadata is the same for every file; only the file
+        # path and date lines are formatted per file
+        metadata = _metadata_lines(
+            comment_start,
+            comment_end,
+            f"Author: {header.author}" if header.author else "",
+            f"Email: {header.author_email}" if header.author_email else "",
+            f"Version: {header.version}" if header.version else "",
+        )
+        if metadata:
+            header_lines.append(metadata)
+        if header.include_date and "date" in variables:
+            header_lines.append(
+                _create_header_line(comment_start, comment_end, f"Date: {variables['date']}")
+            )
 
-    return "\n".join(formatted_lines)
+    return "\n".join(header_lines)
 
 
-def _is_special_xml_file(file_path: Path) -> bool:
-    """
-    Check if file is a special XML-based file that needs declaration preservation.
-    Enhanced to include web framework files like Vue and Svelte.
-    """
-    xml_extensions = {
-        # HTML/XML family
-        ".html",
-        ".htm",
-        ".xhtml",
-        ".xml",
-        ".ui",
-        ".qrc",
-        ".ts",
-        # Web component frameworks
-        ".vue",
-        ".svelte",
-        ".astro",
-        ".wxml",
-        ".blade.php",
-        ".hbs",
-        ".handlebars",
-        ".ejs",
-        ".mustache",
-        ".mst",
-        # Documentation formats
-        ".mdx",
-        ".jsx",
-        ".tsx",  # JSX can sometimes have XML-like structure
-    }
-    return file_path.suffix.lower() in xml_extensions
+@lru_cache(maxsize=64)
+def _metadata_lines(comment_start: str, comment_end: str, *lines: str) -> str:
+    """Comment-format the non-empty configured metadata lines of the default header."""
+    return "\n".join(
+        _create_header_line(comment_start, comment_end, line) for line in lines if line
+    )
 
 
 def _process_empty_file(header_block: str) -> str:
@@ -612,23 +844,25 @@ def _process_empty_file(header_block: str) -> str:
     return f"{header_block}\n"
 
 
+@lru_cache(maxsize=64)
+def _comment_affixes(comment_start: str, comment_end: str) -> Tuple[str, str]:
+    """Text placed before and after a header line for a comment style."""
+    return f"{comment_start} ", f" {comment_end}" if comment_end else ""
+
+
 def _create_header_line(comment_start: str, comment_end: str, header: str) -> str:
     """Create a properly formatted header line with comments."""
-    if comment_end:
-        return f"{comment_start} {header} {comment_end}"
-    return f"{comment_start} {header}"
+    prefix, suffix = _comment_affixes(comment_start, comment_end)
+    return f"{prefix}{header}{suffix}"
 
 
-def _has_existing_header(lines: List[str], comment_start: str, start_index: int = 0) -> bool:
-    """
-    Check if file has an existing header at the specified start index.
-    This enhanced version detects various header patterns, not just our specific format.
-    """
-    if not lines[start_index:]:
-        return False
-
-    # Check first few lines for existing headers - these are definite indicators
-    header_indicators = [
+# The prefixes are not interned with sys.intern: the markers are literal
+# constants shared through PATTERNS, and startswith compares characters,
+# not object identity
+@lru_cache(maxsize=64)
+def _header_indicators(comment_start: str) -> Tuple[str, ...]:
+    """Line prefixes that definitely mark an existing header for a comment style."""
+    return (
         f"{comment_start} File:",  # Our standard format
         f"{comment_start}File:",  # No space after comment
         f"{comment_start} file:",  # Lowercase "file"
@@ -636,16 +870,26 @@ def _has_existing_header(lines: List[str], comment_start: str, start_index: int
         f"{comment_start} @file",  # JSDoc style
         f"{comment_start} Source:",  # Alternative format
         f"{comment_start} Path:",  # Alternative format
-    ]
+    )
 
-    # Look for these indicators only in the first line or two
-    for i in range(start_index, min(start_index + 2, len(lines))):
-        line = lines[i].strip()
-        if any(line.startswith(indicator) for indicator in header_indicators):
-            return True
 
-    # If we reach here, we didn't find a primary header indicator
-    return False
+def _has_existing_header(lines: List[str], comment_start: str, start_index: int = 0) -> bool:
+    """
+    Check if file has an existing header at the specified start index.
+    This enhanced version detects various header patterns, not just our specific format.
+    """
+    # Compare lengths rather than slicing, which would copy every line
+    if start_index >= len(lines):
+        return False
+
+    header_indicators = _header_indicators(comment_start)
+
+    # Look for these indicators only in the first line or two. Every indicator
+    # ends in a non-space character, so only leading whitespace matters.
+    if lines[start_index].lstrip().startswith(header_indicators):
+        return True
+    second = start_index + 1
+    return second < len(lines) and lines[second].lstrip().startswith(header_indicators)
 
 
 def _merge_headers(
@@ -664,6 +908,15 @@ def _merge_headers(
     Returns:
         Merged header string
     """
+    return _merge_header_lines(
+        existing_header.strip().split("\n"), new_header, comment_start, comment_end
+    )
+
+
+def _merge_header_lines(
+    existing_lines: List[str], new_header: str, comment_start: str, comment_end: str
+) -> str:
+    """_merge_headers for an existing header already split into lines."""
     # Extract file path from our new header. Strip any trailing comment_end
     # that may be present when callers pass a header fragment that already
     # includes the comment end (e.g. "File: path */"). This prevents cases
@@ -672,13 +925,8 @@ def _merge_headers(
     if comment_end and file_path.endswith(comment_end):
         file_path = file_path[: -len(comment_end)].strip()
 
-    # Split existing header into lines
-    existing_lines = existing_header.strip().split("\n")
-
     # Create our standard header line
-    standard_header = f"{comment_start} File: {file_path}"
-    if comment_end:
-        standard_header += f" {comment_end}"
+    standard_header = _create_header_line(comment_start, comment_end, f"File: {file_path}")
 
     # Identify header line vs. metadata lines
     metadata_lines: List[str] = []
@@ -689,12 +937,10 @@ def _merge_headers(
         if not line:
             continue
 
-        # Check if this is a file path line (to exclude)
-        is_file_path_line = False
-        for keyword in ["file:", "filename:", "path:", "@file"]:
-            if keyword in line.lower() and line.lower().index(keyword) < 15:
-                is_file_path_line = True
-                break
+        # Check if this is a file path line (to exclude): the leftmost match
+        # is the earliest first occurrence of any keyword
+        match = _FILE_PATH_RE.search(line.lower())
+        is_file_path_line = match is not None and match.start() < 15
 
         # If not a file path line, treat as metadata if it starts with a comment
         if not is_file_path_line and line.startswith(comment_start):
@@ -706,18 +952,12 @@ def _merge_headers(
             # Only keep non-empty metadata
             if metadata_text:
                 # Rebuild the comment with our style
-                if comment_end:
-                    metadata_lines.append(f"{comment_start} {metadata_text} {comment_end}")
-                else:
-                    metadata_lines.append(f"{comment_start} {metadata_text}")
+                metadata_lines.append(
+                    _create_header_line(comment_start, comment_end, metadata_text)
+                )
 
     # Build the new header with our standard format followed by preserved metadata
-    if metadata_lines:
-        result = standard_header + "\n" + "\n".join(metadata_lines)
-    else:
-        result = standard_header
-
-    return result
+    return "\n".join([standard_header, *metadata_lines])
 
 
 def _remove_existing_header(
@@ -727,7 +967,9 @@ def _remove_existing_header(
     Remove existing header if present, starting from the specified index.
     This enhanced version handles various header formats and multi-line headers.
     """
-    if not _has_existing_header(lines, comment_start, start_index):
+    # The header check and the boundary scan below share the stripped lines
+    top = [line.strip() for line in lines[start_index : start_index + 10]]
+    if not any(line.startswith(_header_indicators(comment_start)) for line in top[:2]):
         return lines
 
     # If we have a header, let's identify its boundaries
@@ -736,11 +978,11 @@ def _remove_existing_header(
 
     # Look for the start of actual content after the header
     # Skip empty lines and lines that look like header continuations
-    for i in range(start_index + 1, min(len(lines), start_index + 10)):
-        line = lines[i].strip()
+    for i in range(1, len(top)):
+        line = top[i]
         # If empty line or starts with comment marker, consider it part of the header
         if not line or line.startswith(comment_start):
-            header_end = i
+            header_end = start_index + i
         else:
             # We found the first line of actual content
             break
@@ -759,54 +1001,112 @@ def _detect_header_pattern(file_path: Path) -> Optional[Tuple[str, str, str]]:
     """
     try:
         with open(file_path, "r", encoding="utf-8") as f:
-            lines = [line.strip() for line in f.readlines()[:10]]  # Read first 10 lines
+            return _detect_header_pattern_in_lines(list(islice(f, 10)))  # Read first 10 lines
+    except (UnicodeDecodeError, IOError):
+        return None
 
-        if not lines:
-            return None
 
-        # Common comment markers
-        markers = [
-            ("#", ""),
-            ("//", ""),
-            ("/*", "*/"),
-            ("<!--", "-->"),
-            ("%", ""),  # LaTeX
-            (";", ""),  # Assembly, INI
-            ("--", ""),  # SQL, Haskell
-            ("REM", ""),  # Batch
-        ]
+def _detect_header_pattern_in_lines(lines: List[str]) -> Optional[Tuple[str, str, str]]:
+    """Detect an existing header pattern from the first lines of a file already in memory."""
+    # Markers are tried in _HEADER_MARKERS order and lines in file order, so
+    # the earliest line opening with the highest-priority marker wins; one pass
+    # ranks each line by its marker instead of rescanning the lines per marker
+    found: Optional[Tuple[str, str, str]] = None
+    found_rank = len(_HEADER_MARKERS)
+    # Only lines opening with a comment marker can hold a header; a single
+    # startswith per line rejects code and blank lines before any matching
+    for line in map(str.strip, lines[:10]):
+        if not line.startswith(_HEADER_MARKER_STARTS):
+            continue
+        rank, (start, end) = _HEADER_MARKER_RANKS[_HEADER_MARKER_RE.match(line).group()]
+        if rank >= found_rank:
+            continue
 
-        # Check each marker against the first few non-empty lines
-        for start, end in markers:
-            for line in lines:
-                if not line:
-                    continue
-
-                # Check if line starts with comment marker and contains header-like text
-                if line.startswith(start) and any(
-                    keyword in line.lower()
-                    for keyword in ["file", "source", "path", "filename", "@file"]
-                ):
-                    # Extract the pattern (e.g., "File: ", "Filename: ")
-                    text = line[len(start) :].strip()
-                    for keyword in ["file:", "source:", "path:", "filename:", "@file"]:
-                        if keyword in text.lower():
-                            idx = text.lower().find(keyword)
-                            pattern = text[: idx + len(keyword)]
-                            return start, end, pattern
+        # Extract the pattern (e.g., "File: ", "Filename: ") from header-like text
+        text = line[len(start) :].strip()
+        text_lower = text.lower()
+        if not _HEADER_HINT_RE.search(text_lower):
+            continue
+        for keyword in _HEADER_PATTERN_KEYWORDS:
+            idx = text_lower.find(keyword)
+            if idx != -1:
+                found, found_rank = (start, end, text[: idx + len(keyword)]), rank
+                break
+        if found_rank == 0:
+            break
 
-        return None
+    return found
 
-    except (UnicodeDecodeError, IOError):
+
+@dataclass
+class _HeaderInfo:
+    """What _analyze_header found about the header at the top of a file."""
+
+    detected_start: Optional[str]  # Comment marker of the header, None if undetectable
+    header_lines: List[str]  # Leading comment lines in the file's own comment style
+    body_start: int  # Index of the first line after the header
+
+
+def _analyze_header(
+    content: str, lines: List[str], comment_start: str, top: Optional[List[str]] = None
+) -> Optional[_HeaderInfo]:
+    """
+    Examine the first lines of a file for an existing header in one pass.
+
+    Combines _has_existing_header, _detect_header_pattern_in_lines and the
+    boundary scan of _remove_existing_header over a single set of stripped
+    lines, so none of them has to re-read or re-strip the file's start.
+
+    Args:
+        content: Current file content
+        lines: ``content`` split into lines
+        comment_start: Comment start marker
+        top: The first 10 of ``lines`` stripped, if the caller already has them
+
+    Returns:
+        None if the file has no header, otherwise a _HeaderInfo
+    """
+    if top is None:
+        top = [line.strip() for line in lines[:10]]
+    indicators = _header_indicators(comment_start)
+    if not any(line.startswith(indicators) for line in top[:2]):
         return None
 
+    # Detection sees only "\n"-separated lines, as reading the file line by line would
+    pattern = _detect_header_pattern_in_lines(content.split("\n", 10))
+    if pattern is None:
+        return _HeaderInfo(None, [], 0)
+    detected_start = pattern[0]
 
-def _strip_leading_blank_lines(lines: List[str]) -> List[str]:
-    """Remove any leading blank lines from a list of lines."""
+    # capture up to 10 header lines
+    header_lines: List[str] = []
+    for line, stripped in zip(lines, top):
+        if stripped and stripped.startswith(comment_start):
+            header_lines.append(line)
+        elif stripped:
+            break
+
+    # The header is only removed when it is also recognized in the detected style
+    body_start = 0
+    if detected_start == comment_start or any(
+        line.startswith(_header_indicators(detected_start)) for line in top[:2]
+    ):
+        body_start = 1
+        # Skip empty lines and lines that look like header continuations
+        for i in range(1, len(top)):
+            if top[i] and not top[i].startswith(detected_start):
+                break
+            body_start = i + 1
+
+    return _HeaderInfo(detected_start, header_lines, body_start)
+
+
+def _first_nonblank_index(lines: List[str]) -> int:
+    """Return the index of the first non-blank line, or len(lines) if there is none."""
     for i, line in enumerate(lines):
         if line.strip():
-            return lines[i:]
-    return []
+            return i
+    return len(lines)
 
 
 def _compose_with_header_block(header_block: str, body_lines: List[str]) -> str:
@@ -817,26 +1117,78 @@ def _compose_with_header_block(header_block: str, body_lines: List[str]) -> str:
     - trailing newline at EOF
     """
     hb = header_block.rstrip("\n")
-    body = _strip_leading_blank_lines(body_lines)
-    if body:
-        result = f"{hb}\n\n" + "\n".join(body)
-    else:
-        result = f"{hb}\n"
-    if not result.endswith("\n"):
-        result += "\n"
-    return result
+    start = _first_nonblank_index(body_lines)
+    if start < len(body_lines):
+        # Only copy the body when there are leading blank lines to skip
+        body = "\n".join(body_lines[start:] if start else body_lines)
+        # Build the file in one join, adding the newline unless the body brings one
+        return "".join((hb, "\n\n", body, "" if body.endswith("\n") else "\n"))
+    return f"{hb}\n"
 
 
-def _process_shebang_file(lines: List[str], header_block: str, comment_start: str) -> str:
-    """Process a file with a shebang line."""
-    shebang = lines[0]
-    remaining_lines = _remove_existing_header(lines[1:], comment_start)
+def _first_lines(content: str) -> List[str]:
+    """
+    Return the first 10 lines of ``content`` as ``content.splitlines()`` would.
+
+    Only valid for content whose sole line boundary is "\\n".
+    """
+    lines = content.split("\n", 10)
+    if len(lines) <= 10 and not lines[-1]:
+        # The content ends in a newline, which splitlines() does not follow
+        # with an empty line
+        lines.pop()
+    return lines[:10]
+
+
+def _compose_from_line(
+    header_block: str, content: str, lines: Optional[List[str]], start: int
+) -> str:
+    """
+    Compose a file from a header block and ``content`` from line ``start`` on.
+
+    ``lines`` is all of ``content.splitlines()``, or None when "\\n" is the
+    only line boundary in ``content``. The body is then sliced from the
+    content directly, giving what _compose_with_header_block would have built
+    from the split lines.
+    """
+    if lines is not None:
+        return _compose_with_header_block(header_block, lines[start:])
+
+    end = len(content)
+    pos = 0
+    for _ in range(start):
+        pos = content.find("\n", pos) + 1
+        if not pos:
+            pos = end
+            break
+    # Skip blank lines, as _compose_with_header_block does
+    while pos < end:
+        line_end = content.find("\n", pos)
+        if line_end == -1:
+            line_end = end
+        if content[pos:line_end].strip():
+            break
+        pos = line_end + 1
+
+    hb = header_block.rstrip("\n")
+    if pos >= end:
+        return f"{hb}\n"
+    body = content[pos:]
+    # Joining split lines drops the final newline, and one is only added back
+    # when the body did not end in a blank line
+    if body.endswith("\n"):
+        body = body[:-1]
+    return "".join((hb, "\n\n", body, "" if body.endswith("\n") else "\n"))
+
+
+def _process_shebang_file(
+    shebang: str, body_lines: List[str], header_block: str, comment_start: str
+) -> str:
+    """Process a file with a shebang line, given the shebang and the lines after it."""
+    remaining_lines = _remove_existing_header(body_lines, comment_start)
     rest = _compose_with_header_block(header_block, remaining_lines)
     # Prepend shebang (compose already ensures trailing newline)
-    result = f"{shebang}\n{rest}"
-    if not result.endswith("\n"):
-        result += "\n"
-    return result
+    return f"{shebang}\n{rest}"
 
 
 def _process_xml_like_file(lines: List[str], header_block: str, comment_start: str) -> str:
@@ -853,13 +1205,8 @@ def _process_xml_like_file(lines: List[str], header_block: str, comment_start: s
 
     # Identify special top lines that must be preserved at the very beginning
     for i, line in enumerate(lines):
-        line_stripped = line.strip().lower()
         # Look for XML declarations, DOCTYPE definitions, and processing instructions
-        if (
-            line_stripped.startswith(("<?xml", "<!doctype", "<?php", "<%", "<%=", "<%@"))
-            or line_stripped.startswith("<script setup")
-            or line_stripped.startswith("<template")
-        ):
+        if _DECLARATION_RE.match(line):
             declarations.append(lines[i])
             content_start = i + 1
         else:
@@ -871,40 +1218,20 @@ def _process_xml_like_file(lines: List[str], header_block: str, comment_start: s
         # Remove any existing header from remaining content
         remaining_lines = _remove_existing_header(lines[content_start:], comment_start)
         composed = _compose_with_header_block(header_block, remaining_lines)
-        # Prepend declarations (each is already a single line)
-        result = "\n".join(declarations) + "\n" + composed
-        if not result.endswith("\n"):
-            result += "\n"
-        return result
+        # Prepend declarations (each is already a single line); compose already
+        # ensures the trailing newline
+        return "\n".join(declarations) + "\n" + composed
 
     # If no declarations, treat as regular file with header at top
     remaining_lines = _remove_existing_header(lines, comment_start)
     return _compose_with_header_block(header_block, remaining_lines)
 
 
-def _process_web_framework_file(
-    file_path: Path, lines: List[str], header_block: str, comment_start: str
-) -> str:
-    """
-    Special handling for web framework files like Vue, Svelte, etc.
-    These can have mixed content with template, script, and style sections.
-    """
-    # Identify the file type
-    suffix = file_path.suffix.lower()
-
-    # For Vue, Svelte, and similar component files, ensure header placement is optimal
-    if suffix in {".vue", ".svelte", ".hbs", ".handlebars", ".ejs", ".mustache", ".mst", ".mdx"}:
-        # Check for template/script block patterns
-        has_template = any("<template" in line.lower() for line in lines[:10])
-        has_script_setup = any("<script setup" in line.lower() for line in lines[:15])
-
-        if has_template or has_script_setup:
-            # For Vue files with template or script setup, use special XML processing
-            return _process_xml_like_file(lines, header_block, comment_start)
-
-    # Default back to regular header placement for other cases
-    remaining_lines = _remove_existing_header(lines, comment_start)
-    return _compose_with_header_block(header_block, remaining_lines)
+# Suffix -> processor for file types whose header placement needs special
+# care; every other file gets the header on top
+_PROCESSOR_BY_SUFFIX: Dict[str, Callable[[List[str], str, str], str]] = {
+    suffix: _process_xml_like_file for suffix in _XML_LIKE_EXTENSIONS
+}
 
 
 def is_binary(file_path: Path) -> bool:
@@ -914,128 +1241,148 @@ def is_binary(file_path: Path) -> bool:
         return True
 
     try:
-        with open(file_path, "rb") as f:
-            # Read first 1024 bytes to determine if file is binary
-            chunk = f.read(1024)
-            return b"\0" in chunk  # Binary files typically contain null bytes
+        # Read first 1024 bytes to determine if file is binary
+        chunk = _read_file_start(file_path, 1024)
     except OSError:
         return True
+    return b"\0" in chunk  # Binary files typically contain null bytes
 
 
-def _is_qt_translation_file(file_path: Path) -> bool:
+def _is_qt_translation_file(file_path: Path, head: Optional[bytes] = None) -> bool:
     """
     Determine if a .ts file is a Qt translation file (XML-based) or TypeScript file.
     Qt translation files typically have XML structure with TS root element.
+
+    Args:
+        file_path: Path to the file
+        head: The file's first bytes, if already read
     """
     if file_path.suffix.lower() != ".ts":
         return False
+    return _holds_qt_translation(file_path, head)
 
-    try:
-        content = file_path.read_text(encoding="utf-8")
-        content_lower = content.lower()
-        # Check for XML declaration or DOCTYPE TS or <TS tags
-        return (
-            "<?xml" in content_lower
-            or "<!doctype ts" in content_lower
-            or "<ts " in content_lower
-            or "<ts>" in content_lower
-        )
-    except (OSError, UnicodeDecodeError):
-        # If we can't read the file or encounter an error, default to TypeScript
-        return False
 
+def _holds_qt_translation(file_path: Path, head: Optional[bytes] = None) -> bool:
+    """Check the content of a file already known to be a .ts file for a Qt translation."""
+    if head is None:
+        try:
+            head = _read_file_start(file_path, _QT_PROBE_SIZE)
+        except OSError:
+            # If we can't read the file, default to TypeScript
+            return False
 
-def _get_comment_style(file_path: Path) -> Optional[Tuple[str, str]]:
-    """
-    Determine the appropriate comment style for a given file.
-    Enhanced to handle web framework files and more formats.
-    """
-    # Check if it's a special config file
-    if file_path.name in SPECIAL_FILE_COMMENTS:
-        return SPECIAL_FILE_COMMENTS[file_path.name]
+    # The XML declaration and TS root element open a translation file
+    probe = head[:_QT_PROBE_SIZE].lower()
+    return b"<?xml" in probe or b"<!doctype ts" in probe or b"<ts " in probe or b"<ts>" in probe
 
-    # Web framework special cases
-    if file_path.suffix.lower() == ".vue":
-        return ("<!--", "-->")  # Vue files use HTML comments
 
-    if file_path.suffix.lower() == ".svelte":
-        return ("<!--", "-->")  # Svelte files use HTML comments
+@lru_cache(maxsize=256)
+def _style_for_suffix(suffix: str, pattern_count: int) -> Optional[Tuple[str, str]]:
+    """
+    Resolve the comment style for a file suffix as it appears on disk.
 
-    if file_path.suffix.lower() == ".astro":
-        return ("<!--", "-->")  # Astro files use HTML comments
+    Returns _CONTENT_DEPENDENT_STYLE for suffixes whose style can only be
+    decided by looking at the file itself (.ts).
+    """
+    suffix = suffix.lower()
+    if suffix == ".ts":
+        return _CONTENT_DEPENDENT_STYLE
+    return _extension_table(pattern_count).get(suffix)
 
-    if file_path.suffix.lower() in {".hbs", ".handlebars"}:
-        return ("<!--", "-->")  # Handlebars templates use HTML comments
 
-    if file_path.suffix.lower() == ".ejs":
-        return ("<!--", "-->")  # EJS templates use HTML comments
+def _get_comment_style(file_path: Path, head: Optional[bytes] = None) -> Optional[Tuple[str, str]]:
+    """
+    Determine the appropriate comment style for a given file.
+    Enhanced to handle web framework files and more formats.
 
-    if file_path.suffix.lower() in {".pug", ".jade"}:
-        return ("//", "")  # Pug/Jade templates use // comments
+    Args:
+        file_path: Path to the file
+        head: The file's first bytes, if already read (saves re-opening the file
+            when the style depends on its content)
+    """
+    # Check if it's a special config file
+    name = file_path.name
+    style = SPECIAL_FILE_COMMENTS.get(name)
+    if style:
+        return style
+
+    # Dotfiles such as ".zsh" have no suffix; match them by their full name
+    suffix = file_path.suffix
+    style = _style_for_suffix(suffix or name, len(PATTERNS))
+
+    # Special handling for .ts files (a dotfile named ".ts" has no suffix and
+    # is always TypeScript)
+    if style is _CONTENT_DEPENDENT_STYLE:
+        if suffix and _holds_qt_translation(file_path, head):
+            return ("<!--", "-->")  # XML style for Qt translation files
+        return ("//", "")  # JavaScript style for TypeScript files
 
-    if file_path.suffix.lower() in {".mustache", ".mst"}:
-        return ("<!--", "-->")  # Mustache templates use HTML comments
+    if style:
+        return style
 
-    if file_path.suffix.lower() == ".twig":
-        return ("{#", "#}")  # Twig templates use {# #} comments
+    # Last resort: try to detect from file content
+    first_line = _read_first_line(file_path, head)
+    if first_line is not None:
+        # If it starts with common comment markers, use that
+        match = _FIRST_LINE_MARKER_RE.match(first_line)
+        if match:
+            return _FIRST_LINE_STYLES[match.group()]
 
-    if file_path.suffix.lower() in {".jinja", ".jinja2"}:
-        return ("{#", "#}")  # Jinja2 templates use {# #} comments
+    return None
 
-    if file_path.suffix.lower() == ".mdx":
-        return ("<!--", "-->")  # MDX files use HTML comments
 
-    # Special handling for .ts files
-    if file_path.suffix.lower() == ".ts":
-        if _is_qt_translation_file(file_path):
-            return ("<!--", "-->")  # XML style for Qt translation files
-        return ("//", "")  # JavaScript style for TypeScript files
+def _read_first_line(file_path: Path, head: Optional[bytes] = None) -> Optional[str]:
+    """
+    Return the stripped first line of a file, or None if it cannot be read as UTF-8.
 
-    # Check extension patterns
-    for pattern in PATTERNS:
-        if any(str(file_path).lower().endswith(ext) for ext in pattern.extensions):
-            return (pattern.comment_start, pattern.comment_end)
+    Only the line's start has to show a comment marker, so no more than the
+    first _HEAD_READ_SIZE bytes are looked at. ``head`` holds those bytes (all
+    of the file when it is shorter) if they were already read; the file is
+    only opened when they were not.
+    """
+    if head is None:
+        try:
+            # Binary mode spares the text layer; only this one line is decoded
+            with open(file_path, "rb") as f:
+                head = f.readline(_HEAD_READ_SIZE)
+        except IOError:
+            return None
 
-    # Last resort: try to detect from file content
+    line = head[:_HEAD_READ_SIZE].split(b"\n", 1)[0].split(b"\r", 1)[0]
+    # A line cut off at the limit may end inside a multi-byte character,
+    # which is left out rather than making the line undecodable
+    final = len(line) < _HEAD_READ_SIZE
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            first_line = f.readline().strip()
-
-            # If it starts with common comment markers, use that
-            if first_line.startswith("//"):
-                return ("//", "")
-            if first_line.startswith("#"):
-                return ("#", "")
-            if first_line.startswith("/*"):
-                return ("/*", "*/")
-            if first_line.startswith("<!--"):
-                return ("<!--", "-->")
-    except (UnicodeDecodeError, IOError):
-        pass
+        return codecs.getincrementaldecoder("utf-8")().decode(line, final).strip()
+    except UnicodeDecodeError:
+        return None
 
-    return None
 
+def _collect_metadata_lines(
+    lines: List[str], comment_start: str, top: Optional[List[str]] = None
+) -> List[str]:
+    """
+    Collect metadata lines from the beginning of a file.
 
-def _collect_metadata_lines(lines: List[str], comment_start: str) -> List[str]:
-    """Collect metadata lines from the beginning of a file."""
+    ``top`` may hold the first 10 of ``lines`` already stripped.
+    """
     metadata_lines: List[str] = []
     in_metadata_block = False
 
     # Look at up to the first 10 lines for metadata
-    for i in range(min(10, len(lines))):
-        line = lines[i].strip()
+    if top is None:
+        top = [line.strip() for line in lines[:10]]
+    for line in top:
         # Skip empty lines
         if not line:
             continue
 
         # If line starts with a comment and contains metadata
-        if line.startswith(comment_start) and any(
-            keyword in line.lower()
-            for keyword in ["author:", "version:", "copyright:", "created:", "description:"]
-        ):
+        is_comment = line.startswith(comment_start)
+        if is_comment and _METADATA_RE.search(line.lower()):
             metadata_lines.append(line)
             in_metadata_block = True
-        elif in_metadata_block and line.startswith(comment_start):
+        elif in_metadata_block and is_comment:
             # Continue collecting metadata if we're in a block of commented lines
             metadata_lines.append(line)
         else:
@@ -1046,44 +1393,84 @@ def _collect_metadata_lines(lines: List[str], comment_start: str) -> List[str]:
     return metadata_lines
 
 
-def _should_skip_path(file_path: Path, config: Optional[Annot8Config] = None) -> bool:
-    """Centralize skip logic to reduce statements in process_file."""
-    if not file_path.is_file():
-        logging.warning("File not found: %s", file_path)
-        return True
-    if file_path.suffix.lower() in {".md", ".markdown", ".json"} or (
-        file_path.name.lower() == "license" and not file_path.suffix
-    ):
-        logging.debug("Skipping documentation file: %s", file_path)
-        return True
+def _skip_reason_for_name(name: str, config: Optional[Annot8Config] = None) -> Optional[str]:
+    """
+    Return why a file is skipped judging by its name alone, or None.
 
-    # Check shader files (require #version directive at top)
-    if file_path.suffix.lower() in SHADER_EXTENSIONS:
-        logging.debug("Skipping shader file (requires #version at top): %s", file_path)
-        return True
+    Works on the plain file name so the directory walk can reject most files
+    without building a Path or touching the disk.
+    """
+    suffix = os.path.splitext(name)[1].lower()
+    if suffix in _DOCUMENTATION_EXTENSIONS or (name.lower() == "license" and not suffix):
+        return "documentation file"
+
+    # Shader files require #version directive at top
+    if suffix in SHADER_EXTENSIONS:
+        return "shader file (requires #version at top)"
 
     # Check default ignored files
-    if file_path.name in IGNORED_FILES:
-        logging.debug("Skipping ignored file: %s", file_path)
-        return True
+    if name in IGNORED_FILES:
+        return "ignored file"
 
     # Check config-based ignored files
-    if config and file_path.name in config.files.ignored_files:
-        logging.debug("Skipping config-ignored file: %s", file_path)
-        return True
+    if config and name in config.files.ignored_files:
+        return "config-ignored file"
 
-    if file_path.suffix.lower() in BINARY_EXTENSIONS or is_binary(file_path):
-        logging.debug("Skipping binary file: %s", file_path)
-        return True
-    return False
+    if suffix in BINARY_EXTENSIONS:
+        return "binary file"
+
+    # Another worker's file being rewritten in the same directory
+    if suffix == _TEMP_SUFFIX:
+        return "temporary file"
+    return None
 
 
-def _read_text_best_effort(file_path: Path) -> str:
-    """Read text using UTF-8 with fallback to system default."""
+def _decode_text_best_effort(raw: bytes) -> str:
+    """Decode file bytes using UTF-8 with fallback to the system default encoding."""
     try:
-        return file_path.read_text(encoding="utf-8")
+        return raw.decode("utf-8")
     except UnicodeDecodeError:
-        return file_path.read_text()
+        return raw.decode(locale.getpreferredencoding(False))
+
+
+def _normalize_newlines(text: str) -> str:
+    """Translate CRLF and CR line endings to LF, as a text-mode read would."""
+    if "\r" not in text:
+        return text
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+# Splits text after each CRLF, CR or LF line ending, keeping the endings
+_LINE_SPLIT_RE = re.compile(r"(?<=\n)|(?<=\r)(?!\n)")
+
+# A single CRLF, CR or LF line ending
+_LINE_ENDING_RE = re.compile(r"\r\n?|\n")
+
+
+def _encode_text(text: str, original_text: str) -> bytes:
+    """
+    Encode LF-normalized text as UTF-8, keeping the line endings of ``original_text``.
+
+    The lines ``text`` ends with that are unchanged from the original (the
+    body below the header) keep their own endings, so a file with mixed line
+    endings only changes where its header does. The lines before them take
+    the original's first line ending.
+    """
+    if "\r" not in original_text:
+        return text.encode("utf-8")
+    original_lines = _LINE_SPLIT_RE.split(original_text)
+    new_lines = _LINE_SPLIT_RE.split(text)
+    kept = 0
+    for original_line, new_line in zip(reversed(original_lines), reversed(new_lines)):
+        if _normalize_newlines(original_line) != new_line:
+            break
+        kept += 1
+    first_ending = _LINE_ENDING_RE.search(original_text)
+    newline = first_ending.group() if first_ending else "\n"
+    changed = "".join(new_lines[: len(new_lines) - kept])
+    if newline != "\n":
+        changed = changed.replace("\n", newline)
+    return (changed + "".join(original_lines[len(original_lines) - kept :])).encode("utf-8")
 
 
 def _determine_new_content(
@@ -1103,43 +1490,33 @@ def _determine_new_content(
         comment_end: Comment end marker
         header_block: Complete header block (may be multi-line)
     """
-    lines = content.splitlines()
-    metadata_lines = _collect_metadata_lines(lines, comment_start)
+    if content.startswith("#!"):
+        # Peel off the shebang without splitting it into the body's line list
+        shebang, _, body = content.partition("\n")
+        return _process_shebang_file(shebang, body.splitlines(), header_block, comment_start)
 
-    if not lines:
+    if not content:
         return _process_empty_file(header_block)
-    if lines[0].startswith("#!"):
-        return _process_shebang_file(lines, header_block, comment_start)
-    if _is_special_xml_file(file_path):
-        return _process_xml_like_file(lines, header_block, comment_start)
-    if file_path.suffix.lower() in {
-        ".vue",
-        ".svelte",
-        ".astro",
-        ".hbs",
-        ".handlebars",
-        ".ejs",
-        ".mustache",
-        ".mst",
-        ".mdx",
-    }:
-        return _process_web_framework_file(file_path, lines, header_block, comment_start)
-
-    if _has_existing_header(lines, comment_start):
-        existing_pattern = _detect_header_pattern(file_path)
-        if existing_pattern:
-            detected_start, _detected_end, _pattern = existing_pattern
-            # capture up to 10 header lines
-            header_lines: List[str] = []
-            for i in range(min(10, len(lines))):
-                line = lines[i].strip()
-                if line and line.startswith(comment_start):
-                    header_lines.append(lines[i])
-                elif not line:
-                    continue
-                else:
-                    break
-            existing_header = "\n".join(header_lines)
+    processor = _PROCESSOR_BY_SUFFIX.get(file_path.suffix.lower())
+    if processor is not None:
+        return processor(content.splitlines(), header_block, comment_start)
+
+    # Header handling only looks at the first lines; unless other line
+    # boundaries make splitlines() and "\n" disagree, the body is spliced
+    # from the content as it is instead of being split and joined again
+    all_lines: Optional[List[str]] = None
+    if _has_extra_line_breaks(content):
+        all_lines = lines = content.splitlines()
+    else:
+        lines = _first_lines(content)
+
+    # Header detection and metadata collection both look at the first lines
+    # stripped; strip them once
+    top = [line.strip() for line in lines[:10]]
+    header_info = _analyze_header(content, lines, comment_start, top)
+    if header_info is not None:
+        if header_info.detected_start is not None:
+            body_start = header_info.body_start
 
             # Check if header_block is multi-line (template) or single-line (default)
             header_block_lines = header_block.split("\n")
@@ -1148,8 +1525,7 @@ def _determine_new_content(
             if is_multi_line_template:
                 # For multi-line templates, replace the entire existing header
                 # This preserves the full template structure
-                remaining_lines = _remove_existing_header(lines, detected_start)
-                return _compose_with_header_block(header_block, remaining_lines)
+                return _compose_from_line(header_block, content, all_lines, body_start)
 
             # For single-line headers (default format), use merge logic for compatibility
             # Extract first line of header_block for merging
@@ -1161,35 +1537,178 @@ def _determine_new_content(
                     header_content = header_content[: -len(comment_end)].strip()
             else:
                 header_content = first_header_line
-            merged_header = _merge_headers(
-                existing_header, header_content, comment_start, comment_end
+            # The header lines are merged as found, not joined only to be split again
+            merged_header = _merge_header_lines(
+                header_info.header_lines, header_content, comment_start, comment_end
             )
-            remaining_lines = _remove_existing_header(lines, detected_start)
-            return _compose_with_header_block(merged_header, remaining_lines)
+            return _compose_from_line(merged_header, content, all_lines, body_start)
         # pattern not detectable: bail out
-        logging.debug("File already has header: %s", file_path)
+        _debug("File already has header: %s", file_path)
         return None
 
+    metadata_lines = _collect_metadata_lines(lines, comment_start, top)
     if metadata_lines:
         combined_header = header_block + "\n" + "\n".join(metadata_lines)
+        # metadata_lines are already stripped and start with comment_start, so
+        # only lines containing it need stripping to compare
+        metadata_set = set(metadata_lines)
+        if all_lines is None:
+            all_lines = content.splitlines()
         remaining_lines = [
-            line for line in lines if line.strip() not in [l.strip() for l in metadata_lines]
+            line
+            for line in all_lines
+            if comment_start not in line or line.strip() not in metadata_set
         ]
         return _compose_with_header_block(combined_header, remaining_lines)
 
-    # default: put header on top (ensure one blank line and trailing newline)
-    if content.strip():
-        return _compose_with_header_block(header_block, content.splitlines())
+    # default: put header on top (ensure one blank line and trailing newline);
+    # content is non-empty here, so isspace() tells blank files apart without
+    # copying the content the way strip() would
+    if not content.isspace():
+        return _compose_from_line(header_block, content, all_lines, 0)
     return _process_empty_file(header_block)
 
 
+def _header_is_current(
+    file_path: Path, head: str, tail: str, comment_start: str, comment_end: str, header_block: str
+) -> bool:
+    """
+    Check, from the start and end of a large file, that processing would leave it unchanged.
+
+    ``head`` holds whole lines from the start of the file and ``tail`` its last
+    few characters. Header handling only looks at the first lines of a file, so
+    if rewriting ``head`` on its own is a no-op and the file ends in a single
+    newline, rewriting the whole file is a no-op too.
+    """
+    if not tail.endswith("\n") or tail.endswith("\n\n"):
+        return False
+    # Cheap rejection before the full rewrite below: a current file almost
+    # always contains the expected first header line verbatim. A miss only
+    # costs the shortcut; the caller falls back to processing the whole file.
+    if header_block.partition("\n")[0] not in head:
+        return False
+    lines = head.splitlines()
+    if len(lines) < _HEAD_MIN_LINES:
+        return False
+    # Files without a header get one; metadata collection scans the whole body
+    if not head.startswith("#!") and not _has_existing_header(lines, comment_start):
+        return False
+    new_head = _determine_new_content(file_path, head, comment_start, comment_end, header_block)
+    return new_head is None or new_head == head
+
+
+def _read_fully(read: Callable[[int], bytes], size: int) -> bytes:
+    """Read ``size`` bytes with ``read``, or fewer only at end of file."""
+    data = read(size)
+    # Unbuffered reads may come up short before end of file (e.g. on network mounts)
+    while len(data) < size:
+        more = read(size - len(data))
+        if not more:
+            break
+        data += more
+    return data
+
+
+def _read_block(f: BinaryIO, size: int) -> bytes:
+    """Read ``size`` bytes from an unbuffered file, or fewer only at end of file."""
+    return _read_fully(f.read, size)
+
+
+def _read_file_start(file_path: Path, size: int) -> bytes:
+    """
+    Read the first ``size`` bytes of a file, or all of it if it is shorter.
+
+    The bytes are read straight from a descriptor: for a one-off sniff, a
+    file object would only add its own setup and teardown.
+    """
+    fd = os.open(file_path, _SNIFF_OPEN_FLAGS)
+    try:
+        return _read_fully(partial(os.read, fd), size)
+    finally:
+        os.close(fd)
+
+
+def _head_end(raw: bytes) -> int:
+    """Offset just past the first _HEAD_MIN_LINES lines of ``raw``, or past its last whole line."""
+    end = 0
+    for _ in range(_HEAD_MIN_LINES):
+        end = raw.find(b"\n", end) + 1
+        if not end:
+            return raw.rfind(b"\n") + 1
+    return end
+
+
+def _has_extra_line_breaks(text: str) -> bool:
+    """Check whether ``text`` holds a line boundary other than "\\n" that str.splitlines honours."""
+    if text.isascii():
+        # A substring scan per character is much faster than a character class
+        # search, and ASCII text can only hold the ASCII boundaries
+        for char in _ASCII_EXTRA_LINE_BREAKS:
+            if char in text:
+                return True
+        return False
+    return _EXTRA_LINE_BREAK_RE.search(text) is not None
+
+
+def _text_header_is_current(
+    file_path: Path, content: str, comment_start: str, comment_end: str, header_block: str
+) -> bool:
+    """
+    Check whether processing would leave already decoded ``content`` unchanged.
+
+    Like the first-block check for large files, only the first lines of the
+    file are rewritten, sparing the split and rejoin of the whole body.
+    """
+    end = -1
+    for _ in range(_HEAD_MIN_LINES):
+        end = content.find("\n", end + 1)
+        if end == -1:
+            return False
+    if _has_extra_line_breaks(content):
+        return False
+    return _header_is_current(
+        file_path, content[: end + 1], content[-4:], comment_start, comment_end, header_block
+    )
+
+
+def _read_rest_unless_header_current(
+    f: BinaryIO,
+    raw: bytes,
+    file_path: Path,
+    comment_start: str,
+    comment_end: str,
+    header_block: str,
+) -> Optional[bytes]:
+    """
+    Complete a file's bytes from its first block, or return None when its header is current.
+
+    ``raw`` is the first block already read from ``f``. Large files are checked
+    from that block and their last bytes before the rest is read, so files
+    that need no update are never read in full.
+    """
+    if len(raw) < _HEAD_READ_SIZE:
+        return raw
+
+    # Only the lines header handling can look at are decoded, cut at a line
+    # boundary so a multi-byte character is never split
+    head = _normalize_newlines(_decode_text_best_effort(raw[: _head_end(raw)]))
+    f.seek(-4, os.SEEK_END)
+    tail = _normalize_newlines(f.read().decode("latin-1"))
+    if _header_is_current(file_path, head, tail, comment_start, comment_end, header_block):
+        return None
+
+    f.seek(len(raw))
+    return raw + f.read()
+
+
 def process_file(
     file_path: Path,
     project_root: Path,
     dry_run: bool = False,
     config: Optional[Annot8Config] = None,
-    backup_content: Optional[Dict[str, str]] = None,
+    backup_content: Optional[Union[Dict[str, str], BackupWriter]] = None,
     use_git_metadata: bool = False,
+    git_root: Optional[Path] = None,
 ) -> dict:
     """
     Process a single file, adding or updating its header.
@@ -1199,35 +1718,93 @@ def process_file(
         project_root: Root directory of the project
         dry_run: If True, preview changes without modifying files
         config: Optional configuration object
-        backup_content: Optional dictionary to store original content for backup
-            (key: relative path)
+        backup_content: Optional dictionary or BackupWriter to store original content
+            for backup (key: relative path)
+        use_git_metadata: If True, use git metadata for headers
+        git_root: Root of the git repository, if already known (saves a git call per file)
 
     Returns:
         Dictionary with status information: {"status": "modified|skipped|unchanged"}
     """
-    if _should_skip_path(file_path, config):
+    if not file_path.is_file():
+        logging.warning("File not found: %s", file_path)
+        return {"status": "skipped", "reason": "file_ignored"}
+    reason = _skip_reason_for_name(file_path.name, config)
+    if reason is not None:
+        _debug("Skipping %s: %s", reason, file_path)
         return {"status": "skipped", "reason": "file_ignored"}
+    return _process_regular_file(
+        file_path, project_root, dry_run, config, backup_content, use_git_metadata, git_root
+    )
 
-    comment_style = _get_comment_style(file_path)
-    if not comment_style:
-        logging.debug("Skipping unsupported file type: %s", file_path)
-        return {"status": "skipped", "reason": "unsupported_type"}
 
-    comment_start, comment_end = comment_style
+def _process_regular_file(
+    file_path: Path,
+    project_root: Path,
+    dry_run: bool = False,
+    config: Optional[Annot8Config] = None,
+    backup_content: Optional[Union[Dict[str, str], BackupWriter]] = None,
+    use_git_metadata: bool = False,
+    git_root: Optional[Path] = None,
+    git_user: Optional[Tuple[Optional[str], Optional[str]]] = None,
+) -> dict:
+    """
+    Body of process_file for a path already known to be a regular file.
 
+    Callers (process_file and the directory walk) have already rejected
+    skipped names with _skip_reason_for_name.
+    """
     try:
-        content = _read_text_best_effort(file_path)
-        header_block = _create_header(file_path, project_root, config, use_git_metadata)
-        new_content = _determine_new_content(
+        # One open serves the binary sniff, the header check and the content.
+        # Reads are issued directly, skipping a buffer that would be bypassed.
+        with open(file_path, "rb", buffering=0) as f:
+            raw = _read_block(f, _HEAD_READ_SIZE)
+            if b"\0" in raw[:1024]:  # Binary files typically contain null bytes
+                _debug("Skipping binary file: %s", file_path)
+                return {"status": "skipped", "reason": "file_ignored"}
+
+            comment_style = _get_comment_style(file_path, raw)
+            if not comment_style:
+                _debug("Skipping unsupported file type: %s", file_path)
+                return {"status": "skipped", "reason": "unsupported_type"}
+
+            comment_start, comment_end = comment_style
+            header_block = _create_header(
+                file_path,
+                project_root,
+                config,
+                use_git_metadata,
+                git_root,
+                comment_style,
+                git_user,
+            )
+            raw = _read_rest_unless_header_current(
+                f, raw, file_path, comment_start, comment_end, header_block
+            )
+        if raw is None:
+            _debug("Header already up to date: %s", file_path)
+            return {"status": "unchanged"}
+
+        # Decode from the buffer; the file's own line endings are kept when
+        # writing it back.
+        original_text = _decode_text_best_effort(raw)
+        content = _normalize_newlines(original_text)
+        # Large files were already checked from their first block
+        if len(raw) < _HEAD_READ_SIZE and _text_header_is_current(
             file_path, content, comment_start, comment_end, header_block
-        )
+        ):
+            new_content = None
+        else:
+            new_content = _determine_new_content(
+                file_path, content, comment_start, comment_end, header_block
+            )
 
         if new_content is not None and new_content != content:
             # Save original content for backup (only if not dry-run)
             if backup_content is not None and not dry_run:
                 try:
-                    relative_path = str(file_path.relative_to(project_root))
-                    backup_content[relative_path] = content
+                    relative_path = _relative_to(file_path, project_root)
+                    backup_content[relative_path] = original_text
                 except ValueError:
                     # File is outside project root, skip backup
                     logging.debug("File outside project root, skipping backup: %s", file_path)
@@ -1235,114 +1812,308 @@ def process_file(
             if dry_run:
                 logging.info("[DRY-RUN] Would update header in: %s", file_path)
             else:
-                file_path.write_text(new_content, encoding="utf-8")
-                logging.info("Updated header in: %s", file_path)
+                _replace_file_bytes(file_path, _encode_text(new_content, original_text))
+                _debug("Updated header in: %s", file_path)
             return {"status": "modified"}
-        logging.debug("No changes needed for: %s", file_path)
+        _debug("No changes needed for: %s", file_path)
         return {"status": "unchanged"}
     except (OSError, UnicodeDecodeError) as e:
         logging.debug("Failed to process %s: %s", file_path, e)
         return {"status": "skipped", "reason": str(e)}
 
 
+def _replace_file_bytes(file_path: Path, data: bytes) -> None:
+    """
+    Atomically replace a file's content, so a crash never leaves it half-written.
+
+    The data is written to a temporary file next to the real file (the target
+    of ``file_path`` if it is a symlink), which takes over the original's
+    permission bits and is then renamed over it. The temporary file's name is
+    unique, so writers reaching one file through different links never share
+    it. The data is already encoded, so it goes straight to the descriptor
+    without a buffered file object.
+    """
+    target = os.path.realpath(file_path)
+    directory, name = os.path.split(target)
+    # mkstemp opens in binary mode, so Windows does not translate newlines
+    fd, tmp_path = tempfile.mkstemp(suffix=_TEMP_SUFFIX, prefix=name + ".", dir=directory)
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view) :]
+        finally:
+            os.close(fd)
+        os.chmod(tmp_path, stat.S_IMODE(os.stat(target).st_mode))
+        os.replace(tmp_path, target)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+# Most files handed to a worker thread as one task; smaller batches are used
+# when there are too few files to keep every worker busy
+_MAX_BATCH_SIZE = 64
+
+# Batches handed out per worker before the walk waits for the oldest one
+_BATCHES_PER_WORKER = 2
+
+
+def _process_batch(process: Callable[[Path], dict], batch: List[Path]) -> List[dict]:
+    """Process a batch of files in one worker task."""
+    return [process(item) for item in batch]
+
+
+def _process_concurrently(
+    process: Callable[[Path], dict], files: Iterable[Path], workers: int
+) -> Iterator[dict]:
+    """
+    Process files on a thread pool while the directory walk is still producing them.
+
+    Per-file work is I/O bound and the GIL is released around reads and
+    writes, so threads overlap the file system latency, and handing files out
+    as they are found overlaps it with the walk as well. Async file I/O
+    (aiofiles) would only hand every read and write to a thread pool of its
+    own, adding a round trip per call for the same overlap.
+
+    Files are handed out in batches so the pool's per-task bookkeeping is not
+    paid per file. Batches start as single files, so that small trees still
+    spread over every worker, and double after each round of ``workers``
+    batches up to _MAX_BATCH_SIZE.
+
+    At most _BATCHES_PER_WORKER batches per worker are pending at a time: once
+    that many are, the walk waits for the oldest one and its results are
+    yielded before more files are handed out. Memory therefore stays flat
+    however large the tree, and results come in the order of the files.
+    """
+    pending: Deque["Future[List[dict]]"] = deque()
+    max_pending = workers * _BATCHES_PER_WORKER
+    submitted = 0
+    batch: List[Path] = []
+    batch_size = 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for item in files:
+            batch.append(item)
+            if len(batch) < batch_size:
+                continue
+            if len(pending) == max_pending:
+                yield from pending.popleft().result()
+            pending.append(executor.submit(_process_batch, process, batch))
+            batch = []
+            submitted += 1
+            if submitted % workers == 0:
+                batch_size = min(_MAX_BATCH_SIZE, batch_size * 2)
+        if batch:
+            pending.append(executor.submit(_process_batch, process, batch))
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _default_jobs() -> int:
+    """Default number of worker threads used to process files."""
+    try:
+        # CPUs this process may run on, which containers and taskset can limit
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on Windows and macOS
+        cpus = os.cpu_count() or 1
+    return min(32, cpus * 4)
+
+
+def _iter_files(directory: str, ignored_dirs: FrozenSet[str]) -> Iterator[os.DirEntry]:
+    """
+    Yield the entries of everything below ``directory`` that is not a directory.
+
+    The tree is walked iteratively with ``os.scandir`` so that file types come
+    from the cached directory listing instead of a stat call per entry. Ignored
+    directories are never entered, and symlinked directories are not followed.
+    A directory's entries are only yielded once its listing is closed, so files
+    rewritten while the walk goes on cannot show up in it twice.
+    """
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        files: List[os.DirEntry] = []
+        subdirs: List[str] = []
+        try:
+            # scandir already lists in C; a compiled walker would gain little here
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if not is_dir:
+                        files.append(entry)
+                    elif entry.name not in ignored_dirs and not entry.is_symlink():
+                        subdirs.append(entry.path)
+        except OSError as e:
+            logging.error("Error accessing directory %s: %s", current, e)
+        yield from files
+        # Visit subdirectories in listing order
+        stack.extend(reversed(subdirs))
+
+
+def _git_filter(
+    git_mode: str, project_root: Path, git_root: Path
+) -> Tuple[Optional[Set[Path]], Any]:
+    """Return the files selected by ``git_mode`` and the repository's gitignore patterns."""
+    git_files: Optional[Set[Path]] = None
+    if git_mode == "tracked":
+        git_files = get_git_tracked_files(git_root, project_root)
+    elif git_mode == "staged":
+        git_files = get_git_staged_files(git_root, project_root)
+    return git_files, get_gitignore_patterns(git_root)
+
+
+def _git_selects(
+    item: Path,
+    project_root: Path,
+    git_root: Path,
+    git_files: Optional[Set[Path]],
+    gitignore_spec: Any,
+) -> bool:
+    """Check whether a file passes the git tracked/staged and .gitignore filters."""
+    try:
+        relative_path = item.relative_to(project_root)
+    except ValueError:
+        # File outside project root
+        return False
+    # Check if file is in git set
+    if git_files is not None and relative_path not in git_files:
+        return False
+    # Check if file is gitignored
+    return not is_gitignored(item, git_root, gitignore_spec)
+
+
+def _select_files(
+    directory: Path,
+    project_root: Path,
+    config: Optional[Annot8Config],
+    ignored_dirs: FrozenSet[str],
+    git_root: Optional[Path],
+    git_files: Optional[Set[Path]],
+    gitignore_spec: Any,
+    stats: dict,
+) -> Iterator[Path]:
+    """
+    Yield the files below ``directory`` that should be processed.
+
+    Files rejected by name, type or the git filters (applied when ``git_root``
+    is given) are counted as skipped in ``stats``.
+    """
+    for entry in _iter_files(os.fspath(directory), ignored_dirs):
+        # Reject by name on the plain string before paying for a Path
+        reason = _skip_reason_for_name(entry.name, config)
+        if reason is not None:
+            _debug("Skipping %s: %s", reason, entry.path)
+            stats["skipped"] += 1
+            continue
+        if not entry.is_file():
+            logging.warning("File not found: %s", entry.path)
+            stats["skipped"] += 1
+            continue
+
+        item = Path(entry.path)
+        if git_root and not _git_selects(item, project_root, git_root, git_files, gitignore_spec):
+            stats["skipped"] += 1
+            continue
+
+        yield item
+
+
 def walk_directory(
     directory: Path,
     project_root: Path,
     dry_run: bool = False,
     config: Optional[Annot8Config] = None,
-    backup_content: Optional[Dict[str, str]] = None,
+    backup_content: Optional[Union[Dict[str, str], BackupWriter]] = None,
     git_mode: Optional[str] = None,
     use_git_metadata: bool = False,
+    jobs: Optional[int] = None,
+    git_root: Optional[Path] = None,
 ) -> dict:
     """
-    Walk through directory and process files recursively.
+    Walk through directory and process every file below it.
+
+    The tree is walked iteratively (see _iter_files), so its depth is not
+    bounded by the interpreter's recursion limit.
 
     Args:
         directory: Directory to walk through
         project_root: Root directory of the project
         dry_run: If True, preview changes without modifying files
         config: Optional configuration object
-        backup_content: Optional dictionary to store original content for backup
-            (key: relative path)
+        backup_content: Optional dictionary or BackupWriter to store original content
+            for backup (key: relative path)
         git_mode: Optional git mode: "tracked" (only tracked files) or "staged" (only staged)
         use_git_metadata: If True, use git metadata for headers
+        jobs: Number of worker threads processing files (default: based on CPU count;
+            1 processes files sequentially)
+        git_root: Root of the git repository, if already known (looked up when needed)
 
     Returns:
         Dictionary with statistics: {"modified": int, "skipped": int, "unchanged": int}
     """
     stats = {"modified": 0, "skipped": 0, "unchanged": 0}
 
-    # Git filtering setup
-    git_files: Optional[Set[Path]] = None
-    gitignore_spec = None
-    git_root = None
-
-    if git_mode:
+    if (git_mode or use_git_metadata) and git_root is None:
         git_root = get_git_root(project_root)
+    if use_git_metadata and git_root is None:
+        # Outside a repository there is no git metadata; don't let every file
+        # look for the root again
+        use_git_metadata = False
+    # The configured git user is the same for every file; look it up once
+    git_user = get_git_user(git_root) if use_git_metadata else None
+
+    git_files, gitignore_spec = None, None
+    if git_mode:
         if git_root:
-            if git_mode == "tracked":
-                git_files = get_git_tracked_files(git_root, project_root)
-            elif git_mode == "staged":
-                git_files = get_git_staged_files(git_root, project_root)
-            gitignore_spec = get_gitignore_patterns(git_root)
+            git_files, gitignore_spec = _git_filter(git_mode, project_root, git_root)
         else:
             logging.warning("Git mode requested but not in a git repository")
             git_mode = None
 
-    # Combine default and config-based ignored directories
-    ignored_dirs = IGNORED_DIRS.copy()
-    if config:
-        ignored_dirs.update(config.files.ignored_directories)
-
-    try:
-        for item in directory.iterdir():
-            if item.is_dir():
-                if item.name not in ignored_dirs:
-                    sub_stats = walk_directory(
-                        item,
-                        project_root,
-                        dry_run=dry_run,
-                        config=config,
-                        backup_content=backup_content,
-                        git_mode=git_mode,
-                        use_git_metadata=use_git_metadata,
-                    )
-                    stats["modified"] += sub_stats["modified"]
-                    stats["skipped"] += sub_stats["skipped"]
-                    stats["unchanged"] += sub_stats["unchanged"]
-            else:
-                # Git filtering
-                if git_mode and git_root:
-                    try:
-                        relative_path = item.relative_to(project_root)
-                        # Check if file is in git set
-                        if git_files is not None and relative_path not in git_files:
-                            stats["skipped"] += 1
-                            continue
-                        # Check if file is gitignored
-                        if is_gitignored(item, git_root, gitignore_spec):
-                            stats["skipped"] += 1
-                            continue
-                    except ValueError:
-                        # File outside project root
-                        stats["skipped"] += 1
-                        continue
-
-                result = process_file(
-                    item,
-                    project_root,
-                    dry_run=dry_run,
-                    config=config,
-                    backup_content=backup_content,
-                    use_git_metadata=use_git_metadata,
-                )
-                if result["status"] == "modified":
-                    stats["modified"] += 1
-                elif result["status"] == "skipped":
-                    stats["skipped"] += 1
-                elif result["status"] == "unchanged":
-                    stats["unchanged"] += 1
-    except OSError as e:
-        logging.error("Error accessing directory %s: %s", directory, e)
+    # Combine default and config-based ignored directories, frozen for this
+    # walk so changes to IGNORED_DIRS only apply from the next one
+    ignored_dirs = frozenset(
+        IGNORED_DIRS.union(config.files.ignored_directories) if config else IGNORED_DIRS
+    )
+
+    files = _select_files(
+        directory,
+        project_root,
+        config,
+        ignored_dirs,
+        git_root if git_mode else None,
+        git_files,
+        gitignore_spec,
+        stats,
+    )
+    process = partial(
+        _process_regular_file,
+        project_root=project_root,
+        dry_run=dry_run,
+        config=config,
+        backup_content=backup_content,
+        use_git_metadata=use_git_metadata,
+        git_root=git_root,
+        git_user=git_user,
+    )
+    workers = jobs if jobs is not None else _default_jobs()
+    if workers > 1:
+        results: Iterable[dict] = _process_concurrently(process, files, workers)
+    else:
+        results = map(process, files)
+
+    for result in results:
+        if result["status"] == "modified":
+            stats["modified"] += 1
+        elif result["status"] == "skipped":
+            stats["skipped"] += 1
+        elif result["status"] == "unchanged":
+            stats["unchanged"] += 1
 
     return stats
@@ -4,22 +4,144 @@
 
 import json
 import logging
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
 
 BACKUP_FILENAME = ".annot8_backup.json"
 
+# Key of the metadata record that starts a newline-delimited backup file
+_META_KEY = "__meta__"
+
+# Buffer size for streaming backup records to disk
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Whether files can be opened relative to an open directory descriptor
+_USE_DIR_FD = os.open in os.supports_dir_fd and hasattr(os, "O_DIRECTORY")
+
+# Flags for rewriting an existing file; it is never created
+_REVERT_FLAGS = os.O_WRONLY | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
 
 def _get_backup_path(project_root: Path) -> Path:
     """Get the path to the backup file."""
     return project_root / BACKUP_FILENAME
 
 
+def _dumps(data: Any) -> bytes:
+    """Serialize a backup record to a single line of UTF-8 JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode("utf-8")
+
+
+def _loads(raw: bytes) -> Any:
+    """Deserialize JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode("utf-8"))
+
+
+class BackupWriter:
+    """
+    Stream file backups to disk as files are modified.
+
+    Records are appended to a buffered temporary file next to the backup file,
+    which is synced to disk and atomically replaces the previous backup when
+    the writer is closed. The temporary file's name is unique, so concurrent
+    runs in one project never share it. If nothing was recorded, any existing
+    backup is left untouched.
+
+    Supports ``writer[relative_path] = content`` so it can be passed wherever a
+    backup dictionary is accepted.
+    """
+
+    def __init__(self, project_root: Path) -> None:
+        self._backup_path = _get_backup_path(project_root)
+        self._tmp_path: Optional[str] = None
+        self._file: Optional[BinaryIO] = None
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "BackupWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        # Commit even when the run failed part-way: files modified before
+        # the failure still need their backups.
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __setitem__(self, relative_path: str, content: str) -> None:
+        self.record(relative_path, content)
+
+    def record(self, relative_path: str, content: str) -> None:
+        """Append the original content of one file to the backup (thread-safe)."""
+        data = _dumps({"path": relative_path, "content": content})
+        with self._lock:
+            if self._file is None:
+                fd, self._tmp_path = tempfile.mkstemp(
+                    suffix=".tmp", prefix=BACKUP_FILENAME + ".", dir=self._backup_path.parent
+                )
+                self._file = open(  # pylint: disable=consider-using-with
+                    fd, "wb", buffering=_WRITE_BUFFER_SIZE
+                )
+                self._file.write(_dumps({_META_KEY: {"ts_ns": time.time_ns()}}))
+                self._file.write(b"\n")
+            self._file.write(data)
+            self._file.write(b"\n")
+            self._count += 1
+
+    def close(self) -> bool:
+        """
+        Finish the backup file and move it into place.
+
+        Returns:
+            True if a backup was saved, False if nothing was recorded since the
+            last close or the backup could not be saved
+        """
+        if self._file is None:
+            return False
+        try:
+            # Make the records durable before the rename publishes them, so a
+            # crash never leaves a truncated file in place of the old backup
+            with self._file as f:
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(self._tmp_path, self._backup_path)
+            logging.debug("Saved backup for %d files to %s", self._count, self._backup_path)
+            return True
+        except OSError as e:
+            logging.warning("Failed to save backup: %s", e)
+            try:
+                os.unlink(self._tmp_path)
+            except OSError:
+                pass
+            return False
+        finally:
+            self._file = None
+
+
 def save_backup(project_root: Path, file_backups: Dict[str, str]) -> None:
     """
     Save file backups to the backup file.
 
+    The backup is written as newline-delimited JSON: a metadata record first,
+    followed by one ``{"path": ..., "content": ...}`` record per file, so that
+    entries are streamed to disk instead of serialized as one large document.
+
     Args:
         project_root: Root directory of the project
         file_backups: Dictionary mapping relative file paths to their original content
@@ -28,23 +150,51 @@ def save_backup(project_root: Path, file_backups: Dict[str, str]) -> None:
         logging.debug("No files to backup")
         return
 
-    backup_path = _get_backup_path(project_root)
-    backup_data = {
-        "timestamp": datetime.now().isoformat(),
-        "files": file_backups,
-    }
-
     try:
-        backup_path.write_text(json.dumps(backup_data, indent=2), encoding="utf-8")
-        logging.debug("Saved backup for %d files to %s", len(file_backups), backup_path)
+        with BackupWriter(project_root) as writer:
+            for relative_path, content in file_backups.items():
+                writer.record(relative_path, content)
     except (OSError, ValueError, TypeError) as e:
         logging.warning("Failed to save backup: %s", e)
 
 
+def _describe_timestamp(meta: Dict[str, Any]) -> str:
+    """Render a backup's creation time for log output."""
+    if "ts_ns" in meta:
+        return datetime.fromtimestamp(meta["ts_ns"] / 1e9).isoformat()
+    # Single-document backups written by earlier versions store an ISO string
+    return str(meta.get("timestamp", "unknown"))
+
+
+def _read_backup_entries(lines: Iterable[bytes], backup_path: Path) -> Dict[str, str]:
+    """
+    Read per-file records from a newline-delimited backup.
+
+    A record that cannot be parsed (e.g. a truncated final line) stops reading,
+    keeping every entry recovered up to that point.
+    """
+    files: Dict[str, str] = {}
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            entry = _loads(line)
+            files[entry["path"]] = entry["content"]
+        except (ValueError, KeyError, TypeError):
+            logging.warning(
+                "Backup file %s is damaged; recovered %d files", backup_path, len(files)
+            )
+            break
+    return files
+
+
 def load_backup(project_root: Path) -> Optional[Dict[str, str]]:
     """
     Load the most recent backup from the backup file.
 
+    Both the newline-delimited format and the single-document JSON format
+    written by earlier versions are supported.
+
     Args:
         project_root: Root directory of the project
 
@@ -58,22 +208,111 @@ def load_backup(project_root: Path) -> Optional[Dict[str, str]]:
         return None
 
     try:
-        backup_data = json.loads(backup_path.read_text(encoding="utf-8"))
-        files = backup_data.get("files", {})
-        timestamp = backup_data.get("timestamp", "unknown")
-        logging.debug(
-            "Loaded backup from %s (timestamp: %s, %d files)", backup_path, timestamp, len(files)
-        )
+        with open(backup_path, "rb") as f:
+            try:
+                meta_record = _loads(f.readline())
+            except ValueError:
+                meta_record = None
+
+            if isinstance(meta_record, dict) and _META_KEY in meta_record:
+                meta = meta_record[_META_KEY]
+                files = _read_backup_entries(f, backup_path)
+            else:
+                # Single JSON document written by earlier versions
+                f.seek(0)
+                backup_data = _loads(f.read())
+                files = backup_data.get("files", {})
+                meta = backup_data
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(
+                "Loaded backup from %s (timestamp: %s, %d files)",
+                backup_path,
+                _describe_timestamp(meta),
+                len(files),
+            )
         return files
-    except (OSError, json.JSONDecodeError) as e:
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
         logging.warning("Failed to load backup: %s", e)
         return None
 
 
+def _group_by_directory(file_backups: Dict[str, str]) -> Dict[str, List[Tuple[str, str]]]:
+    """Group backup entries as directory -> [(file name, content)]."""
+    groups: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+    for relative_path, content in file_backups.items():
+        directory, name = os.path.split(relative_path)
+        groups[directory].append((name, content))
+    return groups
+
+
+def _open_directory(dir_path: Path) -> Optional[int]:
+    """Open a directory descriptor for dir_fd-relative opens, or None if unsupported."""
+    if not _USE_DIR_FD:
+        return None
+    return os.open(dir_path, os.O_RDONLY | os.O_DIRECTORY)
+
+
+def _restore_file(dir_path: Path, name: str, content: str, dir_fd: Optional[int]) -> None:
+    """Overwrite one existing file with its original content."""
+    if dir_fd is None:
+        fd = os.open(dir_path / name, _REVERT_FLAGS)
+    else:
+        fd = os.open(name, _REVERT_FLAGS, dir_fd=dir_fd)
+    with open(fd, "wb") as f:
+        f.write(content.encode("utf-8"))
+
+
+def _revert_directory(
+    dir_path: Path, entries: List[Tuple[str, str]], stats: Dict[str, int], dry_run: bool
+) -> None:
+    """Revert all backed-up files of one directory, updating stats in place."""
+    if dry_run:
+        for name, _content in entries:
+            file_path = dir_path / name
+            if file_path.exists():
+                logging.info("[DRY-RUN] Would revert: %s", file_path)
+                stats["reverted"] += 1
+            else:
+                logging.warning("File no longer exists, cannot revert: %s", file_path)
+                stats["missing"] += 1
+        return
+
+    try:
+        dir_fd = _open_directory(dir_path)
+    except (FileNotFoundError, NotADirectoryError):
+        for name, _content in entries:
+            logging.warning("File no longer exists, cannot revert: %s", dir_path / name)
+        stats["missing"] += len(entries)
+        return
+    except OSError:
+        # Fall back to opening each file by its full path
+        dir_fd = None
+
+    try:
+        for name, original_content in entries:
+            file_path = dir_path / name
+            try:
+                _restore_file(dir_path, name, original_content, dir_fd)
+                logging.debug("Reverted: %s", file_path)
+                stats["reverted"] += 1
+            except (FileNotFoundError, NotADirectoryError):
+                logging.warning("File no longer exists, cannot revert: %s", file_path)
+                stats["missing"] += 1
+            except (OSError, UnicodeEncodeError) as e:
+                logging.error("Failed to revert %s: %s", file_path, e)
+                stats["errors"] += 1
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
+
+
 def revert_files(project_root: Path, dry_run: bool = False) -> Dict[str, int]:
     """
     Revert files from the most recent backup.
 
+    Files are restored directory by directory; where the platform supports it,
+    each directory is opened once and its files are opened relative to it.
+
     Args:
         project_root: Root directory of the project
         dry_run: If True, preview changes without modifying files
@@ -88,24 +327,8 @@ def revert_files(project_root: Path, dry_run: bool = False) -> Dict[str, int]:
 
     stats = {"reverted": 0, "missing": 0, "errors": 0}
 
-    for relative_path, original_content in file_backups.items():
-        file_path = project_root / relative_path
-
-        if not file_path.exists():
-            logging.warning("File no longer exists, cannot revert: %s", file_path)
-            stats["missing"] += 1
-            continue
-
-        try:
-            if dry_run:
-                logging.info("[DRY-RUN] Would revert: %s", file_path)
-            else:
-                file_path.write_text(original_content, encoding="utf-8")
-                logging.info("Reverted: %s", file_path)
-            stats["reverted"] += 1
-        except (OSError, UnicodeEncodeError) as e:
-            logging.error("Failed to revert %s: %s", file_path, e)
-            stats["errors"] += 1
+    for directory, entries in _group_by_directory(file_backups).items():
+        _revert_directory(project_root / directory, entries, stats, dry_run)
 
     if not dry_run and stats["reverted"] > 0:
         # Optionally remove backup file after successful revert
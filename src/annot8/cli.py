@@ -11,7 +11,7 @@ from pathlib import Path
 from typing import Optional
 
 from .annotate_headers import walk_directory
-from .backup import revert_files, save_backup
+from .backup import BackupWriter, revert_files
 from .config import load_config
 from .git_integration import get_git_root, is_git_repository
 
@@ -30,6 +30,17 @@ def setup_logging(verbose: bool) -> None:
     )
 
 
+def _positive_int(value: str) -> int:
+    """Argparse type for options that take a positive integer."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value!r}")
+    return number
+
+
 def parse_args(args=None) -> argparse.Namespace:
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(
@@ -73,6 +84,13 @@ def parse_args(args=None) -> argparse.Namespace:
         action="store_true",
         help="Install pre-commit hook to annotate staged files",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=_positive_int,
+        default=None,
+        help="Number of files to process in parallel (default: based on CPU count)",
+    )
     return parser.parse_args(args)
 
 
@@ -133,7 +151,12 @@ annot8 --staged --use-git-metadata
 
 
 def _handle_annotation(
-    project_root: Path, dry_run: bool, config, git_mode: Optional[str], use_git_metadata: bool
+    project_root: Path,
+    dry_run: bool,
+    config,
+    git_mode: Optional[str],
+    use_git_metadata: bool,
+    jobs: Optional[int] = None,
 ) -> int:
     """Handle normal annotation mode."""
     if dry_run:
@@ -157,20 +180,24 @@ def _handle_annotation(
         else:
             logging.info("Using git metadata for headers")
 
-    backup_content: dict = {}
-    stats = walk_directory(
-        project_root,
-        project_root,
-        dry_run=dry_run,
-        config=config,
-        backup_content=backup_content,
-        git_mode=git_mode,
-        use_git_metadata=use_git_metadata,
-    )
+    # Original contents are streamed to the backup file as files are modified
+    with BackupWriter(project_root) as backup_writer:
+        stats = walk_directory(
+            project_root,
+            project_root,
+            dry_run=dry_run,
+            config=config,
+            backup_content=backup_writer,
+            git_mode=git_mode,
+            use_git_metadata=use_git_metadata,
+            jobs=jobs,
+        )
+        # Closing reports whether the backup was saved; if the walk raises,
+        # leaving the block still closes the writer
+        backup_saved = backup_writer.close()
 
-    if not dry_run and backup_content:
-        save_backup(project_root, backup_content)
-        logging.debug("Backup saved for %d files", len(backup_content))
+    if backup_saved:
+        logging.debug("Backup saved for %d files", len(backup_writer))
 
     if dry_run:
         logging.info("=" * 60)
@@ -217,7 +244,12 @@ def main(directory: Optional[Path] = None) -> int:
             git_mode = "tracked"
 
         return _handle_annotation(
-            project_root, args.dry_run, config, git_mode, args.use_git_metadata
+            project_root,
+            args.dry_run,
+            config,
+            git_mode,
+            args.use_git_metadata,
+            args.jobs,
         )
 
     except (OSError, AnnotationError) as e:
@@ -6,7 +6,7 @@ import logging
 import subprocess
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 
 try:
     from pathspec import PathSpec
@@ -57,13 +57,17 @@ def get_git_root(directory: Path) -> Optional[Path]:
     return None
 
 
-def get_git_tracked_files(git_root: Path, relative_to: Optional[Path] = None) -> Set[Path]:
+def _get_git_listed_files(
+    git_root: Path, relative_to: Optional[Path], args: List[str], kind: str
+) -> Set[Path]:
     """
-    Get all files tracked by git.
+    Run a git command that lists files and collect the ones that exist.
 
     Args:
         git_root: Root of the git repository
         relative_to: Directory to make paths relative to (default: git_root)
+        args: git command listing one path per line, relative to git_root
+        kind: What the files are, for the debug message on failure
 
     Returns:
         Set of file paths (relative to relative_to or git_root)
@@ -73,7 +77,7 @@ def get_git_tracked_files(git_root: Path, relative_to: Optional[Path] = None) ->
 
     try:
         result = subprocess.run(
-            ["git", "ls-files"],
+            ["git", *args],
             cwd=git_root,
             capture_output=True,
             text=True,
@@ -83,7 +87,7 @@ def get_git_tracked_files(git_root: Path, relative_to: Optional[Path] = None) ->
         if result.returncode != 0:
             return set()
 
-        tracked_files = set()
+        listed_files = set()
         for line in result.stdout.strip().split("\n"):
             if not line:
                 continue
@@ -91,59 +95,48 @@ def get_git_tracked_files(git_root: Path, relative_to: Optional[Path] = None) ->
             try:
                 relative_path = file_path.relative_to(relative_to)
                 if file_path.exists() and file_path.is_file():
-                    tracked_files.add(relative_path)
+                    listed_files.add(relative_path)
             except ValueError:
                 # File is outside relative_to directory
                 continue
 
-        return tracked_files
+        return listed_files
     except (subprocess.TimeoutExpired, FileNotFoundError, OSError) as e:
-        logging.debug("Failed to get git tracked files: %s", e)
+        logging.debug("Failed to get git %s files: %s", kind, e)
         return set()
 
 
-def get_git_staged_files(git_root: Path, relative_to: Optional[Path] = None) -> Set[Path]:
+def get_git_tracked_files(git_root: Path, relative_to: Optional[Path] = None) -> Set[Path]:
     """
-    Get all files staged for commit.
+    Get all files tracked by git.
 
     Args:
         git_root: Root of the git repository
         relative_to: Directory to make paths relative to (default: git_root)
 
     Returns:
-        Set of staged file paths (relative to relative_to or git_root)
+        Set of file paths (relative to relative_to or git_root)
     """
-    if relative_to is None:
-        relative_to = git_root
+    return _get_git_listed_files(git_root, relative_to, ["ls-files"], "tracked")
 
-    try:
-        result = subprocess.run(
-            ["git", "diff", "--cached", "--name-only", "--diff-filter=ACMR"],
-            cwd=git_root,
-            capture_output=True,
-            text=True,
-            check=False,
-            timeout=10,
-        )
-        if result.returncode != 0:
-            return set()
 
-        staged_files = set()
-        for line in result.stdout.strip().split("\n"):
-            if not line:
-                continue
-            file_path = git_root / line
-            try:
-                relative_path = file_path.relative_to(relative_to)
-                if file_path.exists() and file_path.is_file():
-                    staged_files.add(relative_path)
-            except ValueError:
-                continue
+def get_git_staged_files(git_root: Path, relative_to: Optional[Path] = None) -> Set[Path]:
+    """
+    Get all files staged for commit.
 
-        return staged_files
-    except (subprocess.TimeoutExpired, FileNotFoundError, OSError) as e:
-        logging.debug("Failed to get git staged files: %s", e)
-        return set()
+    Args:
+        git_root: Root of the git repository
+        relative_to: Directory to make paths relative to (default: git_root)
+
+    Returns:
+        Set of staged file paths (relative to relative_to or git_root)
+    """
+    return _get_git_listed_files(
+        git_root,
+        relative_to,
+        ["diff", "--cached", "--name-only", "--diff-filter=ACMR"],
+        "staged",
+    )
 
 
 def get_gitignore_patterns(git_root: Path) -> Optional[PathSpec]:
@@ -220,19 +213,20 @@ def is_gitignored(file_path: Path, git_root: Path, gitignore_spec: Optional[Path
         return False
 
 
-def get_git_author(git_root: Path) -> Optional[str]:
+def _get_git_config_value(git_root: Path, key: str) -> Optional[str]:
     """
-    Get the git user name from git config.
+    Get a value from git config.
 
     Args:
         git_root: Root of the git repository
+        key: Config key to read, e.g. "user.name"
 
     Returns:
-        Git user name, or None if not found
+        The value, or None if not set
     """
     try:
         result = subprocess.run(
-            ["git", "config", "user.name"],
+            ["git", "config", key],
             cwd=git_root,
             capture_output=True,
             text=True,
@@ -246,6 +240,19 @@ def get_git_author(git_root: Path) -> Optional[str]:
     return None
 
 
+def get_git_author(git_root: Path) -> Optional[str]:
+    """
+    Get the git user name from git config.
+
+    Args:
+        git_root: Root of the git repository
+
+    Returns:
+        Git user name, or None if not found
+    """
+    return _get_git_config_value(git_root, "user.name")
+
+
 def get_git_email(git_root: Path) -> Optional[str]:
     """
     Get the git user email from git config.
@@ -256,20 +263,20 @@ def get_git_email(git_root: Path) -> Optional[str]:
     Returns:
         Git user email, or None if not found
     """
-    try:
-        result = subprocess.run(
-            ["git", "config", "user.email"],
-            cwd=git_root,
-            capture_output=True,
-            text=True,
-            check=False,
-            timeout=5,
-        )
-        if result.returncode == 0:
-            return result.stdout.strip() or None
-    except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
-        pass
-    return None
+    return _get_git_config_value(git_root, "user.email")
+
+
+def get_git_user(git_root: Path) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Get the user name and email from git config.
+
+    Args:
+        git_root: Root of the git repository
+
+    Returns:
+        Tuple of (user name, user email), each None if not found
+    """
+    return get_git_author(git_root), get_git_email(git_root)
 
 
 def get_git_file_author(file_path: Path, git_root: Path) -> Optional[str]:
@@ -345,7 +352,10 @@ def get_git_file_date(
 
 
 def get_git_metadata(
-    file_path: Path, git_root: Path, config: Optional[Dict] = None
+    file_path: Path,
+    git_root: Path,
+    config: Optional[Dict] = None,
+    git_user: Optional[Tuple[Optional[str], Optional[str]]] = None,
 ) -> Dict[str, Optional[str]]:
     """
     Get git metadata for a file (author, email, date).
@@ -354,6 +364,8 @@ def get_git_metadata(
         file_path: File to get metadata for (must be relative to git_root)
         git_root: Root of the git repository
         config: Optional config dict with date_format
+        git_user: The repository's (user name, user email) from get_git_user, if
+            already known (saves two git calls per file)
 
     Returns:
         Dictionary with 'author', 'email', and 'date' keys
@@ -372,10 +384,10 @@ def get_git_metadata(
         metadata["author"] = file_author
     else:
         # Fallback to git config user.name
-        metadata["author"] = get_git_author(git_root)
+        metadata["author"] = git_user[0] if git_user else get_git_author(git_root)
 
     # Get email from git config
-    metadata["email"] = get_git_email(git_root)
+    metadata["email"] = git_user[1] if git_user else get_git_email(git_root)
 
     # Get file modification date from git
     metadata["date"] = get_git_file_date(file_path, git_root, date_format)
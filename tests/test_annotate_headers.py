@@ -3,11 +3,24 @@
 
 """Core tests for the annotate_headers functionality."""
 
+import logging
 from pathlib import Path
 
 import pytest
 
-from annot8.annotate_headers import _get_comment_style, process_file, walk_directory
+from annot8 import annotate_headers
+from annot8.annotate_headers import (
+    PATTERNS,
+    FilePattern,
+    _compose_from_line,
+    _compose_with_header_block,
+    _determine_new_content,
+    _extension_table,
+    _get_comment_style,
+    _is_qt_translation_file,
+    process_file,
+    walk_directory,
+)
 from tests.test_utils import (
     cleanup_test_directory,
     create_temp_test_directory,
@@ -93,6 +106,31 @@ class TestBasicFileProcessing:
         assert content == original_content, "Unsupported file should not be modified"
         assert "File:" not in content, "Header should not be added to unsupported file type"
 
+    def test_skip_reasons_are_logged_only_at_debug_level(self, tmp_path, caplog):
+        """Test that per-file skip messages appear at debug level and not above it."""
+        unsupported = tmp_path / "data.unknownext"
+        unsupported.write_text("plain text\n")
+
+        with caplog.at_level(logging.INFO):
+            process_file(unsupported, tmp_path)
+        assert not caplog.records
+
+        with caplog.at_level(logging.DEBUG):
+            process_file(unsupported, tmp_path)
+        assert "Skipping unsupported file type" in caplog.text
+
+    def test_is_binary_checks_extension_before_content(self, tmp_path):
+        """Test that known binary extensions are recognized without opening the file."""
+        assert annotate_headers.is_binary(tmp_path / "missing.PNG")
+
+        text_file = tmp_path / "notes.dat"
+        text_file.write_bytes(b"plain text\n" * 200)
+        nul_file = tmp_path / "blob.dat"
+        nul_file.write_bytes(b"header" + b"\0" * 10)
+
+        assert not annotate_headers.is_binary(text_file)
+        assert annotate_headers.is_binary(nul_file)
+
     def test_binary_file_detection_and_skipping(self):
         """Test that binary files are detected and skipped."""
         binary_file = TEST_DIR / "binary" / "test.bin"
@@ -175,6 +213,23 @@ class TestXMLAndHTMLFiles:
         assert lines[1] == "<!-- File: test.xml -->", "Header not on second line"
         assert "<root>" in processed_content, "XML content preserved"
 
+    @pytest.mark.parametrize(
+        "name, content, expected",
+        [
+            ("block.css", "<template>\nx {}\n", "/* File: block.css */\n\n<template>\nx {}\n"),
+            ("view.vue", "<template>\nx\n", "<template>\n<!-- File: view.vue -->\n\nx\n"),
+            ("view.tsx", "<template>\nx\n", "<template>\n// File: view.tsx\n\nx\n"),
+        ],
+    )
+    def test_declarations_kept_on_top_by_extension(self, tmp_path, name, content, expected):
+        """Test that leading declarations are kept by file extension, not by comment style."""
+        file_path = tmp_path / name
+        file_path.write_text(content)
+
+        process_file(file_path, tmp_path)
+
+        assert file_path.read_text() == expected
+
 
 class TestCommentStyleDetection:
     """Test comment style detection for various file types."""
@@ -221,6 +276,133 @@ class TestCommentStyleDetection:
         comment_style = _get_comment_style(dat_file)
         assert comment_style is None, "Unsupported file should return None for comment style"
 
+    def test_unknown_extension_sniffed_from_read_bytes(self):
+        """Test that content-based style detection uses bytes already read from the file."""
+        unread_file = TEST_DIR / "never_written.unknownext"
+
+        assert _get_comment_style(unread_file, b"// generated\nbody\n") == ("//", "")
+        assert _get_comment_style(unread_file, b"plain text\r\n") is None
+
+    def test_unknown_extension_sniffed_from_disk(self):
+        """Test that content-based style detection reads the first line when no bytes are given."""
+        comment_file = TEST_DIR / "sniffed.unknownext"
+        comment_file.write_bytes(b"  /* generated */\r\n\xff\xfe rest\n")
+        undecodable_file = TEST_DIR / "undecodable.unknownext"
+        undecodable_file.write_bytes(b"# \xff\xfe\n")
+
+        assert _get_comment_style(comment_file) == ("/*", "*/")
+        assert _get_comment_style(undecodable_file) is None
+
+    def test_unknown_extension_sniffs_only_the_start_of_a_long_line(self):
+        """Test that a long first line is judged by its start, without reading all of it."""
+        unread_file = TEST_DIR / "never_written.unknownext"
+        one_line_file = TEST_DIR / "minified.unknownext"
+        # The character cut at the read limit must not make the line undecodable
+        one_line_file.write_bytes("# ".encode() + "é".encode() * 100_000)
+
+        assert _get_comment_style(unread_file, b"// short file") == ("//", "")
+        assert _get_comment_style(unread_file, b"// " + b"x" * 5000) == ("//", "")
+        assert _get_comment_style(one_line_file) == ("#", "")
+
+    @pytest.mark.parametrize(
+        "head,style",
+        [
+            (b"// c\n", ("//", "")),
+            (b"#!\n", ("#", "")),
+            (b"/** doc */\n", ("/*", "*/")),
+            (b"<!-- c -->\n", ("<!--", "-->")),
+            (b"<! c\n", None),
+            (b"/ c\n", None),
+        ],
+    )
+    def test_unknown_extension_style_from_first_line_marker(self, head, style):
+        """Test that each recognised comment marker maps to its style."""
+        assert _get_comment_style(TEST_DIR / "marker.unknownext", head) == style
+
+    def test_appended_pattern_is_used(self, monkeypatch):
+        """Test that patterns appended to PATTERNS after import are honoured."""
+        custom_file = TEST_DIR / "test.customext"
+        custom_file.write_text("some data")
+        patterns = PATTERNS.copy()
+        patterns.append(FilePattern([".customext"], "%%", ""))
+        monkeypatch.setattr(annotate_headers, "PATTERNS", patterns)
+
+        assert _get_comment_style(custom_file) == ("%%", "")
+
+    @pytest.mark.parametrize(
+        "path, style",
+        [
+            (Path("lib.py", "Main.JAVA"), ("//", "")),
+            (Path("build.js", "script.R"), ("#", "")),
+            (Path("src", "STYLE.CSS"), ("/*", "*/")),
+        ],
+    )
+    def test_style_from_own_suffix_in_any_case(self, path, style):
+        """Test that the style comes from the file's own suffix, whatever its case."""
+        assert _get_comment_style(path) == style
+
+    def test_added_special_file_is_used(self, monkeypatch):
+        """Test that names added to SPECIAL_FILE_COMMENTS after a lookup take effect."""
+        special_file = TEST_DIR / "my-config"
+        assert _get_comment_style(special_file, b"plain\n") is None
+
+        monkeypatch.setitem(annotate_headers.SPECIAL_FILE_COMMENTS, "my-config", ("#", ""))
+
+        assert _get_comment_style(special_file, b"plain\n") == ("#", "")
+
+    def test_first_pattern_for_an_extension_wins(self, monkeypatch):
+        """Test that an appended pattern does not override a built-in extension."""
+        py_file = TEST_DIR / "precedence.py"
+        py_file.write_text("value = 1")
+        patterns = PATTERNS.copy()
+        patterns.append(FilePattern([".PY"], "%%", ""))
+        monkeypatch.setattr(annotate_headers, "PATTERNS", patterns)
+
+        assert _get_comment_style(py_file) == ("#", "")
+
+    def test_ts_style_probes_content_only_for_ts_suffix(self):
+        """Test that only .ts files, not a dotfile named ".ts", are probed for Qt translations."""
+        qt_head = b'<?xml version="1.0" encoding="utf-8"?>\n<TS version="2.1">\n'
+
+        assert _get_comment_style(TEST_DIR / "app_de.TS", qt_head) == ("<!--", "-->")
+        assert _get_comment_style(TEST_DIR / ".ts", qt_head) == ("//", "")
+
+    def test_ts_probe_reads_only_the_start_of_the_file(self, tmp_path):
+        """Test that Qt translation markup is only looked for in the first bytes from disk."""
+        qt_file = tmp_path / "app_de.ts"
+        qt_file.write_bytes(b'<?xml version="1.0"?>\n<TS version="2.1">\n' + b" " * 100_000)
+        late_file = tmp_path / "late.ts"
+        late_file.write_bytes(b"// a" * 1000 + b"\n<TS>\n")
+
+        assert _is_qt_translation_file(qt_file)
+        assert not _is_qt_translation_file(late_file)
+
+    def test_extension_table_is_read_only(self):
+        """Test that the shared extension table cannot be modified by a caller."""
+        table = _extension_table(len(PATTERNS))
+
+        assert table[".py"] == ("#", "")
+        with pytest.raises(TypeError):
+            table[".py"] = ("//", "")
+
+    def test_comment_style_resolved_once_per_file(self, monkeypatch):
+        """Test that processing a file resolves its comment style a single time."""
+        ts_file = TEST_DIR / "resolve_once.ts"
+        ts_file.write_text("const value = 1;\n")
+
+        calls = []
+        real_get_comment_style = _get_comment_style
+
+        def counting_get_comment_style(file_path, *args):
+            calls.append(file_path)
+            return real_get_comment_style(file_path, *args)
+
+        monkeypatch.setattr(annotate_headers, "_get_comment_style", counting_get_comment_style)
+        process_file(ts_file, TEST_DIR)
+
+        assert ts_file.read_text().startswith("// File: resolve_once.ts")
+        assert len(calls) == 1, "comment style should be resolved once per file"
+
 
 class TestDirectoryTraversal:
     """Test directory traversal and recursive processing."""
@@ -360,6 +542,13 @@ HEADERS += mainwindow.h
             "<translation>你好</translation>" in processed_content
         ), "Translation content preserved"
 
+    def test_typescript_mentioning_xml_later_is_not_translation(self):
+        """Test that only the start of a .ts file decides whether it is a Qt translation."""
+        ts_file = TEST_DIR / "markup.ts"
+        ts_file.write_text("const a = 1;\n" * 100 + 'const xml = "<?xml version=\\"1.0\\"?>";\n')
+
+        assert _get_comment_style(ts_file) == ("//", ""), "TypeScript misdetected as Qt XML"
+
 
 class TestPowerShellFiles:
     """Test handling of PowerShell files with various comment patterns."""
@@ -548,6 +737,21 @@ class TestExistingHeaderHandling:
         header_count = second_content.count("File: duplicate_test.py")
         assert header_count == 1, f"Should have exactly 1 header, found {header_count}"
 
+    def test_no_duplicate_headers_for_added_comment_style(self, monkeypatch):
+        """Test that headers in a comment style added after import are recognized."""
+        bang_file = TEST_DIR / "duplicate_test.bang"
+        bang_file.write_text("say hello\n")
+        patterns = PATTERNS.copy()
+        patterns.append(FilePattern([".bang"], "!!", ""))
+        monkeypatch.setattr(annotate_headers, "PATTERNS", patterns)
+
+        process_file(bang_file, TEST_DIR)
+        first_content = bang_file.read_text()
+        process_file(bang_file, TEST_DIR)
+
+        assert first_content.startswith("!! File: duplicate_test.bang\n")
+        assert bang_file.read_text() == first_content
+
     def test_css_existing_annotation_preserved(self):
         """Ensure existing CSS single-line block annotations are not corrupted.
 
@@ -598,6 +802,105 @@ class TestExistingHeaderHandling:
         assert "src/styles/globals.css" in processed
         assert "body { color: red; }" in processed
 
+    def test_large_file_with_current_header_unchanged(self, tmp_path):
+        """Test that a large file whose header is already current is reported unchanged."""
+        large_file = tmp_path / "large.py"
+        original = "# File: large.py\n\n" + "value = 1\n" * 2000
+        large_file.write_text(original)
+
+        result = process_file(large_file, tmp_path)
+
+        assert result["status"] == "unchanged"
+        assert large_file.read_text() == original
+
+    @pytest.mark.parametrize(
+        "original",
+        [
+            "# File: old/large.py\n\n" + "value = 1\n" * 2000,
+            "# File: large.py\n" + "value = 1\n" * 2000,
+            "# File: large.py\n\n" + "value = 1\n" * 2000 + "\n",
+        ],
+    )
+    def test_large_file_needing_update_is_rewritten(self, tmp_path, original):
+        """Test that large files are still updated when the start or end needs changes."""
+        large_file = tmp_path / "large.py"
+        large_file.write_text(original)
+
+        result = process_file(large_file, tmp_path)
+
+        assert result["status"] == "modified"
+        assert large_file.read_text() == "# File: large.py\n\n" + "value = 1\n" * 2000
+
+    @pytest.mark.parametrize("lines", [3, 40, 2000])
+    def test_current_file_is_never_written(self, tmp_path, monkeypatch, lines):
+        """Test that a file whose header is current is left untouched on disk."""
+        current_file = tmp_path / "current.py"
+        original = "# File: current.py\n\n" + "value = 1\n" * lines
+        current_file.write_text(original)
+        inode = current_file.stat().st_ino
+
+        def no_write(file_path, data):
+            raise AssertionError(f"unexpected write to {file_path}")
+
+        monkeypatch.setattr(annotate_headers, "_replace_file_bytes", no_write)
+        result = process_file(current_file, tmp_path)
+
+        assert result["status"] == "unchanged"
+        assert current_file.stat().st_ino == inode
+
+    def test_small_file_with_current_header_checked_from_head(self, tmp_path, monkeypatch):
+        """Test that a small current file is not rewritten in full to find it unchanged."""
+        small_file = tmp_path / "small.py"
+        original = "# File: small.py\n\n" + "value = 1\n" * 40
+        small_file.write_text(original)
+
+        contents = []
+        real_determine = _determine_new_content
+
+        def recording_determine(file_path, content, *args):
+            contents.append(content)
+            return real_determine(file_path, content, *args)
+
+        monkeypatch.setattr(annotate_headers, "_determine_new_content", recording_determine)
+        result = process_file(small_file, tmp_path)
+
+        assert result["status"] == "unchanged"
+        assert small_file.read_text() == original
+        assert original not in contents, "only the first lines should be rewritten"
+
+    @pytest.mark.parametrize("line_break", ["\x0c", "\u2028"])
+    def test_small_file_with_other_line_break_is_still_normalized(self, tmp_path, line_break):
+        """Test that the head check does not skip files whose body the rewrite changes."""
+        small_file = tmp_path / "feed.py"
+        body = "value = 1\n" * 20 + line_break + "\n" + "value = 2\n"
+        small_file.write_text("# File: feed.py\n\n" + body, encoding="utf-8")
+
+        result = process_file(small_file, tmp_path)
+
+        assert result["status"] == "modified"
+        expected = "# File: feed.py\n\n" + body.replace(line_break, "\n")
+        assert small_file.read_text(encoding="utf-8") == expected
+
+    @pytest.mark.parametrize(
+        "content,start",
+        [
+            ("x = 1\ny = 2", 0),
+            ("\n\n  \nx = 1\n\n\n", 0),
+            ("# File: a.py\n# Author: b\n\nx = 1\n", 2),
+            ("# File: a.py\n", 1),
+            ("# File: a.py\n\n\n", 1),
+            ("\n", 0),
+        ],
+    )
+    def test_spliced_body_matches_joined_lines(self, content, start):
+        """Test that slicing the body from the content equals splitting and joining it."""
+        lines = content.splitlines()
+        expected = _compose_with_header_block("# File: a.py\n", lines[start:])
+
+        spliced = _compose_from_line("# File: a.py\n", content, None, start)
+
+        assert spliced == expected
+
 
 class TestDryRunMode:
     """Test dry-run functionality."""
@@ -7,6 +7,9 @@ from unittest.mock import patch
 import logging
 from pathlib import Path
 import tempfile
+
+import pytest
+
 from annot8.cli import main, setup_logging, parse_args
 
 
@@ -39,6 +42,15 @@ def test_parse_args_dry_run():
     assert args.verbose
 
 
+def test_parse_args_jobs():
+    """Test argument parsing of the parallelism option."""
+    assert parse_args([]).jobs is None
+    assert parse_args(["--jobs", "4"]).jobs == 4
+    assert parse_args(["-j", "1"]).jobs == 1
+    with pytest.raises(SystemExit):
+        parse_args(["--jobs", "0"])
+
+
 def test_main_directory_not_found():
     """Test main function with non-existent directory."""
     with patch("annot8.cli.parse_args") as mock_parse_args:
@@ -51,6 +63,7 @@ def test_main_directory_not_found():
             staged=False,
             use_git_metadata=False,
             install_hook=False,
+            jobs=None,
         )
         exit_code = main()
         assert exit_code == 1
@@ -72,6 +85,7 @@ def test_main_successful_run():
                 staged=False,
                 use_git_metadata=False,
                 install_hook=False,
+                jobs=None,
             )
             exit_code = main()
             assert exit_code == 0
@@ -97,6 +111,7 @@ def test_main_dry_run():
                 staged=False,
                 use_git_metadata=False,
                 install_hook=False,
+                jobs=None,
             )
             exit_code = main()
             assert exit_code == 0
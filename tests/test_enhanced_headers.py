@@ -8,7 +8,9 @@ from pathlib import Path
 import pytest
 
 from annot8.annotate_headers import (
+    _analyze_header,
     _detect_header_pattern,
+    _detect_header_pattern_in_lines,
     _has_existing_header,
     _merge_headers,
     _remove_existing_header,
@@ -56,6 +58,15 @@ def test_detect_header_pattern():
             assert detected_end == expected_end, f"Incorrect end marker for {header}"
 
 
+def test_detect_header_pattern_prefers_marker_order():
+    """Test that an earlier marker wins over an earlier line, and later lines are still searched."""
+    lines = ["// File: a.js", "# File: a.py", "-- Path: a.sql"]
+    assert _detect_header_pattern_in_lines(lines) == ("#", "", "File:")
+    assert _detect_header_pattern_in_lines(lines[::-1]) == ("#", "", "File:")
+    assert _detect_header_pattern_in_lines(["// file", "// Source: a.js"]) == ("//", "", "Source:")
+    assert _detect_header_pattern_in_lines(["x = 1", "REM filename"]) is None
+
+
 def test_has_existing_header():
     """Test enhanced existing header detection."""
     header_formats = [
@@ -94,6 +105,13 @@ def test_has_existing_header():
             header_lines, "#"
         ), "Failed to detect valid header with metadata"
 
+    # Only the line at start_index and the one after it are looked at
+    lines = ["#!/bin/sh", "", "  # File: run.sh  ", "# Path: run.sh"]
+    assert _has_existing_header(lines, "#", 1), "Failed to detect header on the second line"
+    assert _has_existing_header(lines, "#", 3), "Failed to detect header on the last line"
+    assert not _has_existing_header(lines, "#", 4), "Detected header past the last line"
+    assert not _has_existing_header(["", "", "# File: x"], "#"), "Looked past the second line"
+
 
 def test_remove_existing_header():
     """Test removing headers of various formats."""
@@ -119,6 +137,20 @@ def test_remove_existing_header():
     assert result == lines, "Modified content when no header exists"
 
 
+def test_analyze_header_agrees_with_separate_helpers():
+    """The fused header analysis matches detection, capture and removal done separately."""
+    content = "# File: old.py\n# Author: John Doe\n\nimport sys\n"
+    lines = content.splitlines()
+    info = _analyze_header(content, lines, "#")
+
+    assert info is not None
+    assert info.detected_start == "#"
+    assert info.header_lines == ["# File: old.py", "# Author: John Doe"]
+    assert lines[info.body_start :] == _remove_existing_header(lines, "#")
+
+    assert _analyze_header("import sys\n", ["import sys"], "#") is None
+
+
 def test_merge_headers():
     """Test merging existing headers with our standard format."""
     # Merge with additional information
@@ -0,0 +1,115 @@
+# File: tests/test_file_io.py
+# pylint: disable=too-few-public-methods
+
+"""Tests for the low-level reads and writes of processed files."""
+
+import io
+import os
+from pathlib import Path
+
+import pytest
+
+from annot8.annotate_headers import (
+    _read_block,
+    _read_file_start,
+    _replace_file_bytes,
+    is_binary,
+    process_file,
+)
+
+
+class TestFileReads:
+    """Test reading the start of files."""
+
+    def test_short_reads_are_completed(self):
+        """Test that the first block is filled even when the OS returns short reads."""
+
+        class TrickleFile(io.BytesIO):
+            """File object returning at most three bytes per read."""
+
+            def read(self, size=-1):
+                return super().read(3 if size < 0 else min(size, 3))
+
+        data = b"x = 1\n" * 10
+        assert _read_block(TrickleFile(data), 25) == data[:25]
+        assert _read_block(TrickleFile(data), 4096) == data
+
+    def test_sniffed_start_is_completed_after_short_reads(self, tmp_path, monkeypatch):
+        """Test that sniffing a file's start keeps reading when the OS returns short reads."""
+        data_file = tmp_path / "data.bin"
+        data_file.write_bytes(b"x = 1\n" * 10 + b"\0")
+        real_read = os.read
+        monkeypatch.setattr(os, "read", lambda fd, size: real_read(fd, min(size, 3)))
+
+        assert _read_file_start(data_file, 25) == b"x = 1\n" * 4 + b"x"
+        assert _read_file_start(data_file, 1024) == b"x = 1\n" * 10 + b"\0"
+        assert is_binary(data_file)
+
+
+class TestFileRewrites:
+    """Test replacing the content of updated files."""
+
+    def test_short_writes_are_completed(self, tmp_path, monkeypatch):
+        """Test that the whole file is written even when the OS accepts short writes."""
+        target = tmp_path / "data.py"
+        target.write_text("")
+        real_write = os.write
+
+        def trickle_write(fd, data):
+            return real_write(fd, bytes(data[:3]))
+
+        monkeypatch.setattr(os, "write", trickle_write)
+        _replace_file_bytes(target, b"x = 1\r\n" * 10)
+
+        assert target.read_bytes() == b"x = 1\r\n" * 10
+
+    def test_rewrite_keeps_permissions_and_leaves_no_temp_file(self, tmp_path):
+        """Test that updated files keep their mode and no temporary file is left behind."""
+        script = tmp_path / "run.sh"
+        script.write_text("echo hello\n")
+        script.chmod(0o755)
+
+        process_file(script, tmp_path)
+
+        assert script.read_text() == "# File: run.sh\n\necho hello\n"
+        assert script.stat().st_mode & 0o777 == 0o755
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["run.sh"]
+
+    def test_writers_of_one_file_use_separate_temp_files(self, tmp_path, monkeypatch):
+        """Test that rewrites reaching one file through a link never share a temp file."""
+        target = tmp_path / "shared.py"
+        target.write_text("value = 1\n")
+        link = tmp_path / "alias.py"
+        try:
+            link.symlink_to(target)
+        except (OSError, NotImplementedError):
+            pytest.skip("Symlinks are not supported on this platform")
+        temp_paths = []
+        real_replace = os.replace
+
+        def recording_replace(src, dst):
+            temp_paths.append(src)
+            real_replace(src, dst)
+
+        monkeypatch.setattr(os, "replace", recording_replace)
+        _replace_file_bytes(link, b"value = 2\n")
+        _replace_file_bytes(target, b"value = 3\n")
+
+        assert len(set(temp_paths)) == 2
+        assert all(Path(path).suffix == ".annot8-tmp" for path in temp_paths)
+        assert target.read_bytes() == b"value = 3\n"
+
+    def test_rewrite_through_symlink_updates_target(self, tmp_path):
+        """Test that updating a symlinked file rewrites its target and keeps the link."""
+        target = tmp_path / "target.py"
+        target.write_text("value = 1\n")
+        link = tmp_path / "link.py"
+        try:
+            link.symlink_to(target)
+        except (OSError, NotImplementedError):
+            pytest.skip("Symlinks are not supported on this platform")
+
+        process_file(link, tmp_path)
+
+        assert link.is_symlink()
+        assert target.read_text() == "# File: link.py\n\nvalue = 1\n"
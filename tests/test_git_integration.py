@@ -9,6 +9,8 @@ from pathlib import Path
 
 import pytest
 
+from annot8 import annotate_headers, git_integration
+from annot8.config import Annot8Config, HeaderConfig
 from annot8.git_integration import (
     get_git_author,
     get_git_email,
@@ -300,3 +302,64 @@ def test_get_git_file_date_no_history(git_repo):
     date = get_git_file_date(untracked_file, repo_path)
     # Should return None if file has no git history
     assert date is None
+
+
+def test_walk_directory_resolves_git_root_once(git_repo, monkeypatch):
+    """Test that git metadata lookups share a single git root resolution."""
+    for index in range(3):
+        (git_repo / f"module{index}.py").write_text(f"value = {index}\n")
+
+    calls = []
+    real_get_git_root = annotate_headers.get_git_root
+
+    def counting_get_git_root(directory):
+        calls.append(directory)
+        return real_get_git_root(directory)
+
+    monkeypatch.setattr(annotate_headers, "get_git_root", counting_get_git_root)
+    stats = annotate_headers.walk_directory(git_repo, git_repo, use_git_metadata=True)
+
+    assert stats["modified"] == 3
+    assert len(calls) == 1, "git root should be resolved once per walk"
+
+
+def test_walk_directory_outside_repository_looks_for_git_root_once(monkeypatch):
+    """Test that git metadata outside a repository does not look for the root per file."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        for index in range(3):
+            (temp_path / f"module{index}.py").write_text(f"value = {index}\n")
+
+        calls = []
+
+        def counting_get_git_root(directory):
+            calls.append(directory)
+
+        monkeypatch.setattr(annotate_headers, "get_git_root", counting_get_git_root)
+        stats = annotate_headers.walk_directory(temp_path, temp_path, use_git_metadata=True)
+
+        assert stats["modified"] == 3
+        assert len(calls) == 1, "git root should be looked for once per walk"
+
+
+def test_walk_directory_looks_up_git_user_once(git_repo, monkeypatch):
+    """Test that the configured git user is read once per walk, not per file."""
+    for index in range(3):
+        (git_repo / f"module{index}.py").write_text(f"value = {index}\n")
+
+    calls = []
+    real_get_git_email = git_integration.get_git_email
+
+    def counting_get_git_email(git_root):
+        calls.append(git_root)
+        return real_get_git_email(git_root)
+
+    monkeypatch.setattr(git_integration, "get_git_email", counting_get_git_email)
+    config = Annot8Config(header=HeaderConfig(template="File: {file_path}\nEmail: {author_email}"))
+    stats = annotate_headers.walk_directory(
+        git_repo, git_repo, config=config, use_git_metadata=True
+    )
+
+    assert stats["modified"] == 3
+    assert "# Email: test@example.com" in (git_repo / "module1.py").read_text()
+    assert len(calls) == 1, "git user should be looked up once per walk"
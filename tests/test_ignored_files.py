@@ -276,3 +276,15 @@ def test_shader_extensions_constant_contains_common_entries():
     }
     missing = [ext for ext in expected_extensions if ext not in SHADER_EXTENSIONS]
     assert not missing, f"Expected shader extensions missing in SHADER_EXTENSIONS: {missing}"
+
+
+def test_binary_content_skipped():
+    """Test that files containing null bytes are skipped even with a text extension."""
+    binary_file = TEST_DIR / "data.py"
+    original_content = b"\x00\x01\x02binary payload\n"
+    binary_file.write_bytes(original_content)
+
+    result = process_file(binary_file, TEST_DIR)
+
+    assert result["status"] == "skipped", "Binary content should be skipped"
+    assert binary_file.read_bytes() == original_content, "Binary file should not be modified"
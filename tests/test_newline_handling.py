@@ -2,10 +2,12 @@
 
 """Tests for improved newline handling (relaxed: no strict trailing-newline limits)."""
 
+import locale
 from pathlib import Path
 
 import pytest
 
+from annot8 import annotate_headers
 from annot8.annotate_headers import process_file
 from tests.helpers.components import WEB_FRAMEWORK_TEMPLATES
 from tests.test_utils import (
@@ -195,3 +197,81 @@ def test_comment_only_file_header_added():
 
     assert processed_content.startswith("# File: header_only.py")
     assert "Some comment that looks like content" in processed_content
+
+
+def test_crlf_line_endings_preserved():
+    """Files using CRLF line endings keep them, including on the new header line."""
+    crlf_file = TEST_DIR / "crlf.py"
+    crlf_file.write_bytes(b"import os\r\nprint(os.name)\r\n")
+
+    process_file(crlf_file, TEST_DIR)
+
+    assert crlf_file.read_bytes() == b"# File: crlf.py\r\n\r\nimport os\r\nprint(os.name)\r\n"
+
+
+def test_mixed_line_endings_kept_outside_the_header():
+    """Lines below the header keep their own endings; the header takes the first one."""
+    lf_file = TEST_DIR / "mixed_lf.py"
+    lf_file.write_bytes(b'import os\nx = 1\ny = "a"\r\nz = 2\n')
+    crlf_file = TEST_DIR / "mixed_crlf.py"
+    crlf_file.write_bytes(b"import os\r\nx = 1\ry = 2\r\n")
+
+    process_file(lf_file, TEST_DIR)
+    process_file(crlf_file, TEST_DIR)
+
+    assert lf_file.read_bytes() == b'# File: mixed_lf.py\n\nimport os\nx = 1\ny = "a"\r\nz = 2\n'
+    assert crlf_file.read_bytes() == b"# File: mixed_crlf.py\r\n\r\nimport os\r\nx = 1\ry = 2\r\n"
+
+
+def test_existing_header_replaced_in_mixed_line_ending_file():
+    """Replacing a header rewrites only the header lines of a mixed-ending file."""
+    mixed_file = TEST_DIR / "mixed_header.py"
+    mixed_file.write_bytes(b"# File: old/name.py\r\n\r\nx = 1\ny = 2\r\n")
+
+    process_file(mixed_file, TEST_DIR)
+
+    assert mixed_file.read_bytes() == b"# File: mixed_header.py\r\n\r\nx = 1\ny = 2\r\n"
+
+
+def test_non_utf8_file_decoded_with_locale_fallback(monkeypatch):
+    """Files that are not valid UTF-8 are decoded from the same buffer with the locale encoding."""
+    monkeypatch.setattr(locale, "getpreferredencoding", lambda do_setlocale=True: "latin-1")
+    latin1_file = TEST_DIR / "latin1.py"
+    latin1_file.write_bytes("print('café')\n".encode("latin-1"))
+
+    opened = []
+    real_open = open
+
+    def recording_open(file, *args, **kwargs):
+        opened.append(Path(file).name)
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr(annotate_headers, "open", recording_open, raising=False)
+    result = process_file(latin1_file, TEST_DIR)
+
+    assert result["status"] == "modified"
+    assert opened == ["latin1.py"]
+    assert latin1_file.read_bytes() == "# File: latin1.py\n\nprint('café')\n".encode("utf-8")
+
+
+def test_large_non_utf8_file_read_once(monkeypatch):
+    """A large file that only fails UTF-8 after its first block is still opened just once."""
+    monkeypatch.setattr(locale, "getpreferredencoding", lambda do_setlocale=True: "latin-1")
+    latin1_file = TEST_DIR / "latin1_large.py"
+    body = "value = 1\n" * 1000 + "print('café')\n"
+    latin1_file.write_bytes(body.encode("latin-1"))
+
+    opened = []
+    real_open = open
+
+    def recording_open(file, *args, **kwargs):
+        opened.append(Path(file).name)
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr(annotate_headers, "open", recording_open, raising=False)
+    result = process_file(latin1_file, TEST_DIR)
+
+    assert result["status"] == "modified"
+    assert opened == ["latin1_large.py"]
+    # Updated files are always written back as UTF-8
+    assert latin1_file.read_text(encoding="utf-8") == "# File: latin1_large.py\n\n" + body
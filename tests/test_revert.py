@@ -7,9 +7,11 @@ from pathlib import Path
 
 import pytest
 
+from annot8 import backup
 from annot8.annotate_headers import process_file, walk_directory
 from annot8.backup import (
     BACKUP_FILENAME,
+    BackupWriter,
     clear_backup,
     load_backup,
     revert_files,
@@ -50,6 +52,16 @@ def test_save_and_load_backup():
     assert loaded == backup_content, "Loaded backup should match saved content"
 
 
+def test_save_and_load_backup_without_orjson(monkeypatch):
+    """Test that backups round-trip through the stdlib json fallback."""
+    monkeypatch.setattr(backup, "orjson", None)
+    backup_content = {"unicode.py": "print('Hello, 世界!')"}
+
+    save_backup(TEST_DIR, backup_content)
+
+    assert load_backup(TEST_DIR) == backup_content, "Fallback backup should round-trip"
+
+
 def test_load_backup_nonexistent():
     """Test loading backup when no backup file exists."""
     # Use a different directory that definitely has no backup
@@ -200,6 +212,62 @@ def test_walk_directory_creates_backup():
     assert len(loaded) > 0, "Backup should contain files"
 
 
+def test_backup_writer_records_modified_files():
+    """Test that walk_directory can stream backups through a BackupWriter."""
+    test_file = TEST_DIR / "writer_test.py"
+    original_content = "print('writer')"
+    test_file.write_text(original_content)
+
+    with BackupWriter(TEST_DIR) as writer:
+        walk_directory(TEST_DIR, TEST_DIR, backup_content=writer)
+
+    loaded = load_backup(TEST_DIR)
+    assert loaded is not None, "Backup should be loadable"
+    assert loaded["writer_test.py"] == original_content, "Backup should have original content"
+    assert len(writer) == len(loaded), "Writer should count every recorded file"
+
+
+def test_backup_writer_without_records_keeps_previous_backup():
+    """Test that a writer that recorded nothing does not replace the existing backup."""
+    backup_content = {"kept.py": "kept"}
+    save_backup(TEST_DIR, backup_content)
+
+    with BackupWriter(TEST_DIR):
+        pass
+
+    assert load_backup(TEST_DIR) == backup_content, "Existing backup should be kept"
+
+
+def test_backup_writer_close_reports_whether_backup_was_saved(monkeypatch):
+    """Test that close() returns True only when it moved a backup into place."""
+    writer = BackupWriter(TEST_DIR)
+    writer.record("saved.py", "saved")
+    assert writer.close()
+    assert not writer.close(), "Nothing new was recorded"
+
+    def failing_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(backup.os, "replace", failing_replace)
+    writer = BackupWriter(TEST_DIR)
+    writer.record("lost.py", "lost")
+    assert not writer.close()
+    assert load_backup(TEST_DIR) == {"saved.py": "saved"}, "Previous backup should be kept"
+    assert not list(TEST_DIR.glob(BACKUP_FILENAME + ".*")), "Temporary file should be removed"
+
+
+def test_backup_writers_in_one_project_use_separate_temp_files():
+    """Test that two writers open at once in one project do not share a temporary file."""
+    first = BackupWriter(TEST_DIR)
+    second = BackupWriter(TEST_DIR)
+    first.record("first.py", "first")
+    second.record("second.py", "second")
+
+    assert first.close()
+    assert second.close()
+    assert load_backup(TEST_DIR) == {"second.py": "second"}, "Last writer's backup should win"
+
+
 def test_clear_backup():
     """Test clearing backup file."""
     # Create backup
@@ -221,17 +289,40 @@ def test_clear_backup_nonexistent():
     assert result is False, "Should return False when no backup exists"
 
 
-def test_backup_json_structure():
-    """Test that backup JSON has correct structure."""
-    backup_content = {"test.py": "content"}
+def test_backup_ndjson_structure():
+    """Test that the backup is newline-delimited JSON with a metadata record first."""
+    backup_content = {"test.py": "content\nwith newline"}
     save_backup(TEST_DIR, backup_content)
 
     backup_file = TEST_DIR / BACKUP_FILENAME
-    backup_data = json.loads(backup_file.read_text())
+    records = [json.loads(line) for line in backup_file.read_text().splitlines()]
+
+    assert isinstance(records[0]["__meta__"]["ts_ns"], int), "Backup should start with a timestamp"
+    assert records[1:] == [
+        {"path": "test.py", "content": "content\nwith newline"}
+    ], "Each file should be stored as its own record"
+
+
+def test_load_legacy_json_backup():
+    """Test that single-document backups from earlier versions still load."""
+    backup_content = {"test.py": "content"}
+    backup_file = TEST_DIR / BACKUP_FILENAME
+    backup_file.write_text(
+        json.dumps({"timestamp": "2025-01-01T00:00:00", "files": backup_content}, indent=2)
+    )
 
-    assert "timestamp" in backup_data, "Backup should have timestamp"
-    assert "files" in backup_data, "Backup should have files"
-    assert backup_data["files"] == backup_content, "Files should match"
+    assert load_backup(TEST_DIR) == backup_content, "Legacy backup should load"
+
+
+def test_load_truncated_backup_recovers_complete_entries():
+    """Test that a truncated backup still yields the records written before the damage."""
+    save_backup(TEST_DIR, {"a.py": "a", "b.py": "b"})
+
+    backup_file = TEST_DIR / BACKUP_FILENAME
+    raw = backup_file.read_bytes()
+    backup_file.write_bytes(raw[: len(raw) - 5])
+
+    assert load_backup(TEST_DIR) == {"a.py": "a"}, "Complete records should be recovered"
 
 
 def test_revert_preserves_backup_file():
@@ -305,3 +396,15 @@ def test_revert_with_subdirectories():
 
     subfile.unlink()
     subdir.rmdir()
+
+
+def test_revert_missing_directory_and_file_not_recreated(tmp_path):
+    """Test that files in vanished directories count as missing and are not recreated."""
+    (tmp_path / "kept.py").write_bytes(b"modified\r\n")
+    save_backup(tmp_path, {"kept.py": "original\r\n", "gone/lost.py": "content"})
+
+    stats = revert_files(tmp_path)
+
+    assert stats == {"reverted": 1, "missing": 1, "errors": 0}
+    assert (tmp_path / "kept.py").read_bytes() == b"original\r\n", "Bytes should be restored"
+    assert not (tmp_path / "gone").exists(), "Missing directories should not be recreated"
@@ -6,10 +6,16 @@
 import json
 import re
 import tempfile
+from datetime import datetime
 from pathlib import Path
 
-from annot8.annotate_headers import process_file
-from annot8.config import load_config
+from annot8 import annotate_headers
+from annot8.annotate_headers import (
+    _get_template_variables,
+    _render_template,
+    process_file,
+)
+from annot8.config import Annot8Config, load_config
 
 
 class TestTemplateRendering:
@@ -125,6 +131,37 @@ class TestTemplateRendering:
             # Date should be in YYYY-MM-DD format
             assert re.search(r"# Created: \d{4}-\d{2}-\d{2}", content)
 
+    def test_invalid_date_format_falls_back_to_default(self):
+        """Test that a date_format that cannot be used gives a YYYY-MM-DD date."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            config = Annot8Config()
+            config.header.include_date = True
+            config.header.date_format = ["%d.%m.%Y"]  # type: ignore
+
+            variables = _get_template_variables(temp_path / "test.py", temp_path, config)
+
+            assert re.fullmatch(r"\d{4}-\d{2}-\d{2}", variables["date"])
+
+    def test_date_format_with_microseconds_is_not_truncated(self, monkeypatch):
+        """Test that a date_format showing microseconds gets the current ones."""
+
+        class FixedDatetime(datetime):
+            """datetime whose now() is a fixed time with microseconds."""
+
+            @classmethod
+            def now(cls, tz=None):
+                return cls(2026, 1, 2, 3, 4, 5, 678901, tz)
+
+        monkeypatch.setattr(annotate_headers, "datetime", FixedDatetime)
+        config = Annot8Config()
+        config.header.include_date = True
+        config.header.date_format = "%H:%M:%S.%f"
+
+        variables = _get_template_variables(Path("proj", "a.py"), Path("proj"), config)
+
+        assert variables["date"] == "03:04:05.678901"
+
     def test_template_file_variables(self):
         """Test template with file-specific variables."""
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -211,3 +248,22 @@ class TestTemplateRendering:
             assert "# File: test.py" in content
             # Should not have author/date unless configured
             assert "Author:" not in content
+
+    def test_template_variables_substituted_for_each_file(self):
+        """Test that a template parsed once still renders each file's own values."""
+        template = "File: {file_path} ({ file_name | ? })\n\nAuthor: {author|Unknown}{missing}"
+        rendered = [
+            _render_template(template, {"file_path": path, "file_name": name}, "#", "")
+            for path, name in (("a/x.py", "x.py"), ("b.py", ""))
+        ]
+
+        assert rendered == [
+            "# File: a/x.py (x.py)\n\n# Author: Unknown",
+            "# File: b.py ()\n\n# Author: Unknown",
+        ]
+
+    def test_template_braces_outside_variables_are_literal(self):
+        """Test that braces not forming a variable are rendered as written."""
+        rendered = _render_template("Map: {} -> {file_path} }", {"file_path": "a.py"}, "/*", "*/")
+
+        assert rendered == "/* Map: {} -> a.py } */"
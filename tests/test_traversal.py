@@ -0,0 +1,246 @@
+# File: tests/test_traversal.py
+# pylint: disable=too-few-public-methods
+
+"""Tests for directory traversal and concurrent file processing."""
+
+import inspect
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from annot8 import annotate_headers
+from annot8.annotate_headers import (
+    _BATCHES_PER_WORKER,
+    _MAX_BATCH_SIZE,
+    _default_jobs,
+    _get_template_variables,
+    _iter_files,
+    _process_concurrently,
+    _relative_path,
+    _relative_to,
+    walk_directory,
+)
+
+
+class TestDirectoryTraversal:
+    """Test directory traversal."""
+
+    def test_ignored_directories_are_never_listed(self, tmp_path, monkeypatch):
+        """Test that traversal rejects ignored directories by name without listing them."""
+        (tmp_path / "node_modules" / "pkg").mkdir(parents=True)
+        (tmp_path / "node_modules" / "pkg" / "index.js").write_text("module.exports = 1;\n")
+        (tmp_path / "main.py").write_text("print('kept')\n")
+
+        listed = []
+        real_scandir = annotate_headers.os.scandir
+
+        def recording_scandir(path):
+            listed.append(Path(path).name)
+            return real_scandir(path)
+
+        monkeypatch.setattr(annotate_headers.os, "scandir", recording_scandir)
+        stats = walk_directory(tmp_path, tmp_path, jobs=1)
+
+        assert stats["modified"] == 1
+        assert "node_modules" not in listed and "pkg" not in listed
+
+    def test_added_ignored_directory_is_skipped(self, tmp_path, monkeypatch):
+        """Test that directories added to IGNORED_DIRS are skipped by later walks."""
+        (tmp_path / "generated").mkdir()
+        (tmp_path / "generated" / "out.py").write_text("value = 1\n")
+        monkeypatch.setattr(annotate_headers, "IGNORED_DIRS", set(annotate_headers.IGNORED_DIRS))
+        annotate_headers.IGNORED_DIRS.add("generated")
+
+        stats = walk_directory(tmp_path, tmp_path, jobs=1)
+
+        assert stats["modified"] == 0
+        assert (tmp_path / "generated" / "out.py").read_text() == "value = 1\n"
+
+    def test_walk_takes_file_types_from_the_listing(self, tmp_path, monkeypatch):
+        """Test that traversal does not stat files again through Path once they are listed."""
+        (tmp_path / "pkg").mkdir()
+        (tmp_path / "pkg" / "module.py").write_text("value = 1\n")
+
+        def no_stat(self, *args, **kwargs):
+            raise AssertionError(f"unexpected stat of {self}")
+
+        monkeypatch.setattr(Path, "is_file", no_stat)
+        monkeypatch.setattr(Path, "is_dir", no_stat)
+        stats = walk_directory(tmp_path, tmp_path, jobs=1)
+
+        assert stats["modified"] == 1
+
+    def test_files_are_yielded_after_their_listing_is_closed(self, tmp_path, monkeypatch):
+        """Test that no file is handed out while a directory listing is still open."""
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "top.py").write_text("x = 1\n")
+        (tmp_path / "sub" / "nested.py").write_text("y = 2\n")
+
+        open_listings = []
+        real_scandir = annotate_headers.os.scandir
+
+        class TrackedListing:
+            """Context manager recording whether the wrapped listing is open."""
+
+            def __init__(self, path):
+                self.listing = real_scandir(path)
+
+            def __enter__(self):
+                open_listings.append(self)
+                return self.listing.__enter__()
+
+            def __exit__(self, *exc_info):
+                open_listings.remove(self)
+                return self.listing.__exit__(*exc_info)
+
+        monkeypatch.setattr(annotate_headers.os, "scandir", TrackedListing)
+        names = []
+        for entry in _iter_files(str(tmp_path), set()):
+            assert not open_listings, "file yielded while a listing was open"
+            names.append(entry.name)
+
+        assert sorted(names) == ["nested.py", "top.py"]
+
+    def test_symlinked_directories_are_not_followed(self, tmp_path):
+        """Test that traversal does not descend into symlinked directories."""
+        target_dir = tmp_path / "outside"
+        target_dir.mkdir()
+        target_file = target_dir / "linked.py"
+        original_content = "print('outside the tree')\n"
+        target_file.write_text(original_content)
+
+        project_dir = tmp_path / "project"
+        project_dir.mkdir()
+        try:
+            (project_dir / "link").symlink_to(target_dir, target_is_directory=True)
+        except (OSError, NotImplementedError):
+            pytest.skip("Symlinks are not supported on this platform")
+
+        walk_directory(project_dir, project_dir)
+
+        assert target_file.read_text() == original_content, "Symlinked directory was followed"
+
+    @pytest.mark.parametrize("jobs", [1, 4])
+    def test_deep_trees_are_walked_without_recursion(self, tmp_path, jobs):
+        """Test that traversal depth is not limited by the interpreter's recursion limit."""
+        deep_dir = tmp_path.joinpath(*["d"] * 100)
+        deep_dir.mkdir(parents=True)
+        leaf = deep_dir / "leaf.py"
+        leaf.write_text("value = 1\n")
+
+        recursion_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(len(inspect.stack()) + 50)
+        try:
+            stats = walk_directory(tmp_path, tmp_path, jobs=jobs)
+        finally:
+            sys.setrecursionlimit(recursion_limit)
+
+        assert stats["modified"] == 1
+        assert leaf.read_text().startswith("# File: " + "d/" * 100 + "leaf.py")
+
+
+class TestConcurrentProcessing:
+    """Test processing files on worker threads."""
+
+    @pytest.mark.parametrize("jobs", [1, 4])
+    def test_parallel_and_sequential_processing_agree(self, tmp_path, jobs):
+        """Test that worker threads produce the same results as sequential processing."""
+        for index in range(10):
+            package_dir = tmp_path / f"pkg{index % 3}"
+            package_dir.mkdir(exist_ok=True)
+            (package_dir / f"module{index}.py").write_text(f"value = {index}\n")
+
+        backups: dict = {}
+        stats = walk_directory(tmp_path, tmp_path, backup_content=backups, jobs=jobs)
+
+        assert stats == {"modified": 10, "skipped": 0, "unchanged": 0}
+        assert len(backups) == 10
+        header = "# File: pkg1/module4.py\n\nvalue = 4\n"
+        assert (tmp_path / "pkg1" / "module4.py").read_text() == header
+
+    def test_concurrent_processing_bounds_pending_files(self):
+        """Test that the walk is held back while workers are behind, and results stay ordered."""
+        workers = 2
+        pulled = []
+        lead = []
+
+        def files():
+            for index in range(2000):
+                pulled.append(index)
+                yield index
+
+        def process(index):
+            lead.append(len(pulled) - index)
+            return {"index": index}
+
+        results = list(_process_concurrently(process, files(), workers))
+
+        assert [result["index"] for result in results] == list(range(2000))
+        max_batches = workers * _BATCHES_PER_WORKER + 1
+        assert max(lead) <= max_batches * _MAX_BATCH_SIZE
+
+    def test_default_jobs_follow_usable_cpus(self, monkeypatch):
+        """Test that the default worker count is based on the CPUs the process may use."""
+        monkeypatch.setattr(annotate_headers.os, "cpu_count", lambda: 64)
+        monkeypatch.setattr(
+            annotate_headers.os, "sched_getaffinity", lambda pid: {0, 1}, raising=False
+        )
+        assert _default_jobs() == 8
+
+        monkeypatch.delattr(annotate_headers.os, "sched_getaffinity")
+        assert _default_jobs() == 32
+
+
+class TestRelativePaths:
+    """Test making walked paths relative to the project root."""
+
+    @pytest.mark.parametrize(
+        "path, root, expected",
+        [
+            (["proj", "src", "a.py"], ["proj"], ["src", "a.py"]),
+            (["proj", "a.py"], ["proj", ""], ["a.py"]),
+            (["proj2", "a.py"], ["proj"], ["..", "proj2", "a.py"]),
+            (["proj", "..", "other", "a.py"], ["proj"], ["..", "other", "a.py"]),
+        ],
+    )
+    def test_relative_path(self, path, root, expected):
+        """Test that walked paths are made relative by prefix, and others via relpath."""
+        relative = _relative_path(os.path.join(*path), os.path.join(*root))
+        assert relative == os.path.join(*expected)
+
+    @pytest.mark.parametrize(
+        "path, file_path, file_dir",
+        [
+            (Path("proj", "src", "pkg", "a.py"), "src/pkg/a.py", "src/pkg"),
+            (Path("proj", "a.py"), "a.py", "."),
+            (Path("other", "a.py"), "../other/a.py", "../other"),
+        ],
+    )
+    def test_template_path_variables(self, path, file_path, file_dir):
+        """Test that the directory variable is the normalized relative path's parent."""
+        variables = _get_template_variables(path, Path("proj"))
+
+        assert variables["file_path"] == file_path
+        assert variables["file_dir"] == file_dir
+
+    @pytest.mark.parametrize(
+        "path, root",
+        [
+            (Path("proj", "src", "a.py"), Path("proj")),
+            (Path("proj"), Path("proj")),
+            (Path("/proj", "a.py"), Path("/")),
+            (Path("proj2", "a.py"), Path("proj")),
+            (Path("a.py"), Path(".")),
+        ],
+    )
+    def test_relative_to_matches_pathlib(self, path, root):
+        """Test that the sliced relative path equals Path.relative_to, errors included."""
+        try:
+            expected = str(path.relative_to(root))
+        except ValueError:
+            with pytest.raises(ValueError):
+                _relative_to(path, root)
+        else:
+            assert _relative_to(path, root) == expected